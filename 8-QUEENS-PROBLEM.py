@@ -2,41 +2,67 @@ from typing import List
 
 
 class EightQueens:
+    queens: List[int]
     solution: List[List[int]] | None
 
     def __init__(self) -> None:
-        self.solution = [[0 for _ in range(8)] for _ in range(8)]
-        if not self.solve(0):
-            self.solution = None
+        # bit r of rows, bit r + c of diagonals and bit r - c + 7 of antidiagonals
+        # are set while a queen stands on row r, column c
+        self.rows = self.diagonals = self.antidiagonals = 0
+        self.queens = [0] * 8
+        self.solution = None
+        if self.solve(0):
+            self.solution = [[0 for _ in range(8)] for _ in range(8)]
+            for col, row in enumerate(self.queens):
+                self.solution[row][col] = 1
 
     def is_safe_to_move(self, row: int, col: int) -> bool:
-        for i in range(col):
-            if self.solution[row][i] == 1:
-                return False
-
-        for i, j in zip(range(row, -1, -1), range(col, -1, -1)):
-            if self.solution[i][j] == 1:
-                return False
+        return not (
+            self.rows >> row & 1
+            or self.diagonals >> (row + col) & 1
+            or self.antidiagonals >> (row - col + 7) & 1
+        )
 
-        for i, j in zip(range(row, 8, 1), range(col, -1, -1)):
-            if self.solution[i][j] == 1:
-                return False
-        
-        return True
+    def free_rows(self, col: int) -> int:
+        return 0xFF & ~(self.rows | self.diagonals >> col | self.antidiagonals >> (7 - col))
 
     def solve(self, col: int) -> bool:
         if col == 8:
             return True
 
-        for i in range(8):
-            if self.is_safe_to_move(i, col):
-                self.solution[i][col] = 1
-                if self.solve(col + 1):
-                    return True
-                self.solution[i][col] = 0
+        free = self.free_rows(col)
+        while free:
+            bit = free & -free
+            free ^= bit
+            diagonal, antidiagonal = bit << col, bit << (7 - col)
+            self.rows ^= bit
+            self.diagonals ^= diagonal
+            self.antidiagonals ^= antidiagonal
+            self.queens[col] = bit.bit_length() - 1
+            if self.solve(col + 1):
+                return True
+            self.rows ^= bit
+            self.diagonals ^= diagonal
+            self.antidiagonals ^= antidiagonal
 
         return False
 
+    def count_solutions(self) -> int:
+        # masks are relative to the column being filled, so the diagonals just shift by one
+        def count(rows: int, left: int, right: int) -> int:
+            free = 0xFF & ~(rows | left | right)
+            if rows | free & -free == 0xFF:
+                return 1 if free else 0
+            total = 0
+            while free:
+                bit = free & -free
+                free ^= bit
+                total += count(rows | bit, (left | bit) << 1, (right | bit) >> 1)
+            return total
+
+        # a solution and its mirror image start in rows r and 7 - r
+        return 2 * sum(count(1 << row, 2 << row, 1 << row >> 1) for row in range(4))
+
     def __str__(self) -> str:
         if self.solution is None:
             return "No solution found"
@@ -50,4 +76,3 @@ class EightQueens:
 if __name__ == "__main__":
     eight_queens = EightQueens()
     print(eight_queens)
-    
\ No newline at end of file
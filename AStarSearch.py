@@ -1,4 +1,18 @@
+import functools
 import heapq
+import itertools
+import math
+import mmap
+import multiprocessing
+import struct
+import sys
+import time
+from array import array
+from multiprocessing import shared_memory, util
+
+SQRT2 = math.sqrt(2)
+CLOSED = 0x80
+WALKABLE = bytes([0]) + bytes([1]) * 255
 
 
 class Node:
@@ -8,13 +22,380 @@ class Node:
         self.g = self.h = self.f = 0
 
     def __lt__(self, other):
-        return self.f < other.f
+        return self.f < other.f or (self.f == other.f and self.h < other.h)
+
+class BoundedNode(Node):
+    # SMA* tree node; successors not in memory wait in pending as [f, index, cost, forgotten]
+    def __init__(self, position, parent=None):
+        super().__init__(position, parent)
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.children = []
+        self.pending = []
+        self.alive = True
+
+class OpenSet:
+    # Binary heap keyed by position with lazy deletion: pushing a position that is
+    # already open supersedes the older entry, which is skipped when it surfaces.
+    def __init__(self):
+        self.heap = []
+        self.nodes = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, position):
+        return position in self.nodes
+
+    def get(self, position):
+        return self.nodes.get(position)
+
+    def push(self, node):
+        self.nodes[node.position] = node
+        heapq.heappush(self.heap, node)
+
+    def pop(self):
+        while self.heap:
+            node = heapq.heappop(self.heap)
+            if self.nodes.get(node.position) is node:
+                del self.nodes[node.position]
+                return node
+        raise IndexError("pop from empty open set")
+
+class GridMap:
+    # One byte per cell addressed by flat index y * width + x: 0 marks an obstacle,
+    # 1-255 is the cost of entering the cell (times sqrt(2) for a diagonal step).
+    def __init__(self, width, height, costs=None, diagonal=False):
+        if costs is None:
+            costs = bytearray(b"\x01") * (width * height)
+        if len(costs) != width * height:
+            raise ValueError("Cost map size does not match the grid dimensions.")
+        self.width, self.height = width, height
+        self.costs = costs
+        self.diagonal = diagonal
+        self.moves = [(0,1), (1,0), (0,-1), (-1,0)]
+        if diagonal:
+            self.moves += [(1,1), (1,-1), (-1,-1), (-1,1)]
+        self.offsets = [dx + dy * width for dx, dy in self.moves]
+
+    @classmethod
+    def from_rows(cls, rows, diagonal=False):
+        # '#' is an obstacle, '.' costs 1 and a digit 1-9 costs that much
+        width = len(rows[0]) if rows else 0
+        costs = bytearray()
+        for row in rows:
+            if len(row) != width:
+                raise ValueError("All rows must have the same width.")
+            costs.extend(0 if c == '#' else 1 if c == '.' else int(c) for c in row)
+        return cls(width, len(rows), costs, diagonal)
+
+    def cost_bytes(self):
+        return self.costs if isinstance(self.costs, (bytes, bytearray)) else bytes(self.costs)
+
+    @functools.cached_property
+    def min_cost(self):
+        costs = self.cost_bytes()
+        return next((c for c in range(1, 256) if bytes((c,)) in costs), 1)
+
+    @functools.cached_property
+    def uniform(self):
+        costs = self.cost_bytes()
+        return costs.count(self.min_cost) + costs.count(0) == len(costs)
+
+    @functools.cached_property
+    def walk_rows(self):
+        # 1/0 walkable flags framed by a blocked border, row by row, so that straight
+        # runs can be scanned with bytes.find
+        width = self.width
+        flags = self.cost_bytes().translate(WALKABLE)
+        border = bytes(width + 2)
+        return border + b"".join(b"\0" + flags[y * width:(y + 1) * width] + b"\0"
+                                 for y in range(self.height)) + border
+
+    @functools.cached_property
+    def walk_columns(self):
+        # walk_rows transposed
+        rows, span = self.walk_rows, self.width + 2
+        return b"".join(rows[x::span] for x in range(span))
+
+    def index(self, position):
+        return position[1] * self.width + position[0]
+
+    def set_cost(self, position, cost):
+        self.costs[self.index(position)] = cost
+        self.__dict__.pop("uniform", None)
+        self.__dict__.pop("walk_rows", None)
+        self.__dict__.pop("walk_columns", None)
+        if cost and cost < self.min_cost:
+            self.min_cost = cost
+
+    def position(self, index):
+        y, x = divmod(index, self.width)
+        return (x, y)
+
+    def passable(self, position):
+        x, y = position
+        return 0 <= x < self.width and 0 <= y < self.height and self.costs[y * self.width + x] != 0
+
+    def neighbors(self, index, reverse=False):
+        # Yields (neighbor, move, cost); diagonal steps may not cut obstacle corners.
+        # With reverse the cost is that of the step from neighbor back into index.
+        costs, width = self.costs, self.width
+        y, x = divmod(index, width)
+        for move, (dx, dy) in enumerate(self.moves):
+            if 0 <= x + dx < width and 0 <= y + dy < self.height:
+                neighbor = index + self.offsets[move]
+                cost = costs[neighbor]
+                if not cost:
+                    continue
+                if reverse:
+                    cost = costs[index]
+                if dx and dy:
+                    if costs[index + dx] and costs[index + dy * width]:
+                        yield neighbor, move, cost * SQRT2
+                else:
+                    yield neighbor, move, cost
+
+    def adjacent(self, index):
+        # In-bounds neighbor cells whether passable or not
+        y, x = divmod(index, self.width)
+        return [index + offset for (dx, dy), offset in zip(self.moves, self.offsets)
+                if 0 <= x + dx < self.width and 0 <= y + dy < self.height]
+
+    def distance(self, a, b):
+        # Manhattan (4-connected) or octile (8-connected) distance at the cheapest cell cost
+        ay, ax = divmod(a, self.width)
+        by, bx = divmod(b, self.width)
+        dx, dy = abs(ax - bx), abs(ay - by)
+        if self.diagonal:
+            return (dx + dy + (SQRT2 - 2) * min(dx, dy)) * self.min_cost
+        return (dx + dy) * self.min_cost
+
+def dijkstra(grid, source, reverse=False):
+    # Exact cost from source to every cell (to source from every cell with reverse)
+    dist = array('d', [math.inf]) * len(grid.costs)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, current = heapq.heappop(heap)
+        if d > dist[current]:
+            continue
+        for neighbor, _, cost in grid.neighbors(current, reverse=reverse):
+            if d + cost < dist[neighbor]:
+                dist[neighbor] = d + cost
+                heapq.heappush(heap, (d + cost, neighbor))
+    return dist
+
+class Landmarks:
+    # ALT preprocessing for one map: exact distances from (and, when cell costs differ,
+    # to) a few far-apart landmark cells, one float32 per cell per table. Lower bounds
+    # come from the triangle inequality; slack absorbs the float32 rounding.
+    MAGIC = b"ALT1"
+    HEADER = struct.Struct("<4sBBBxIIId")
+
+    def __init__(self, grid, cells, from_tables, to_tables=None, slack=0.0):
+        self.grid = grid
+        self.cells = list(cells)
+        self.from_tables = from_tables
+        self.to_tables = from_tables if to_tables is None else to_tables
+        self.slack = slack
+
+    @classmethod
+    def build(cls, grid, count=8):
+        # Farthest-point selection: each landmark is the cell farthest from those already
+        # chosen, starting from the cell farthest from the first passable one.
+        seed = next((i for i, cost in enumerate(grid.cost_bytes()) if cost), None)
+        if seed is None:
+            raise ValueError("The grid has no passable cells.")
+        symmetric = grid.uniform
+        nearest = dijkstra(grid, seed)
+        cells, from_tables, to_tables, longest = [], [], [], 0.0
+        for _ in range(count):
+            cell = max((i for i, d in enumerate(nearest) if d != math.inf), key=nearest.__getitem__)
+            if cells and not nearest[cell]:
+                break
+            dist = dijkstra(grid, cell)
+            cells.append(cell)
+            from_tables.append(array('f', dist))
+            if not symmetric:
+                to_tables.append(array('f', dijkstra(grid, cell, reverse=True)))
+            longest = max(longest, max((d for d in dist if d != math.inf), default=0.0))
+            nearest = array('d', map(min, nearest, dist)) if len(cells) > 1 else dist
+        # float32 keeps 24 bits of mantissa; two rounded values per bound
+        slack = 2 * longest * 2.0 ** -23
+        return cls(grid, cells, from_tables, None if symmetric else to_tables, slack)
+
+    def heuristic(self, target, reverse=False):
+        # Returns h(index): a lower bound on the cost from index to target,
+        # or from target to index with reverse.
+        grid, slack = self.grid, self.slack
+        sign = -1 if reverse else 1
+        terms = [(table_from, table_from[target], table_to, table_to[target])
+                 for table_from, table_to in zip(self.from_tables, self.to_tables)]
+
+        def h(index):
+            best = grid.distance(index, target)
+            for table_from, from_target, table_to, to_target in terms:
+                bound = max(sign * (from_target - table_from[index]),
+                            sign * (table_to[index] - to_target)) - slack
+                if bound > best:
+                    best = bound
+            return best
+        return h
+
+    def save(self, path):
+        symmetric = self.to_tables is self.from_tables
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, sys.byteorder == "little", symmetric,
+                                     self.grid.diagonal, len(self.cells), self.grid.width,
+                                     self.grid.height, self.slack))
+            f.write(array('i', self.cells).tobytes())
+            for table in self.from_tables if symmetric else self.from_tables + self.to_tables:
+                f.write(table)
+
+    @classmethod
+    def load(cls, path, grid):
+        # Tables stay in the memory map, so processes loading the same file share pages
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, little, symmetric, diagonal, count, width, height, slack = cls.HEADER.unpack_from(buffer)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{path} is not a landmark table file.")
+        if bool(little) != (sys.byteorder == "little"):
+            raise ValueError(f"{path} was written on a machine with a different byte order.")
+        if (width, height, bool(diagonal)) != (grid.width, grid.height, grid.diagonal):
+            raise ValueError(f"{path} was built for a different grid.")
+        view = memoryview(buffer)
+        offset = cls.HEADER.size
+        cells = view[offset:offset + 4 * count].cast('i')
+        offset += 4 * count
+        size = 4 * width * height
+        tables = [view[offset + i * size:offset + (i + 1) * size].cast('f')
+                  for i in range(count if symmetric else 2 * count)]
+        return cls(grid, cells, tables[:count], None if symmetric else tables[count:], slack)
+
+class DStarLite:
+    # D* Lite (Koenig & Likhachev): searches backwards from the goal and keeps g/rhs
+    # between calls, so a cell change only repairs the part of the tree it touches.
+    def __init__(self, grid, start, goal):
+        self.grid = grid
+        self.start, self.goal = grid.index(start), grid.index(goal)
+        self.expansions = 0
+        self.reset()
+
+    def reset(self):
+        self.last, self.km = self.start, 0
+        self.g, self.rhs = {}, {self.goal: 0}
+        self.queue, self.queued = [], {}
+        self.push(self.goal)
+
+    def key(self, index):
+        best = min(self.g.get(index, math.inf), self.rhs.get(index, math.inf))
+        return (best + self.grid.distance(self.start, index) + self.km, best)
+
+    def push(self, index):
+        key = self.key(index)
+        self.queued[index] = key
+        heapq.heappush(self.queue, (key, index))
+
+    def top_key(self):
+        while self.queue:
+            key, index = self.queue[0]
+            if self.queued.get(index) == key:
+                return key
+            heapq.heappop(self.queue)
+        return (math.inf, math.inf)
+
+    def successors(self, index):
+        return self.grid.neighbors(index) if self.grid.costs[index] else ()
+
+    def update_vertex(self, index):
+        if index != self.goal:
+            self.rhs[index] = min((cost + self.g.get(neighbor, math.inf)
+                                   for neighbor, _, cost in self.successors(index)), default=math.inf)
+        self.queued.pop(index, None)
+        if self.g.get(index, math.inf) != self.rhs.get(index, math.inf):
+            self.push(index)
+
+    def compute_shortest_path(self):
+        g, rhs, start = self.g, self.rhs, self.start
+        while (self.top_key() < self.key(start) or
+               rhs.get(start, math.inf) != g.get(start, math.inf)):
+            old_key = self.top_key()
+            if not self.queue:
+                break
+            _, current = heapq.heappop(self.queue)
+            del self.queued[current]
+            self.expansions += 1
+            if old_key < self.key(current):
+                self.push(current)
+            elif g.get(current, math.inf) > rhs[current]:
+                g[current] = rhs[current]
+                for neighbor in self.grid.adjacent(current):
+                    self.update_vertex(neighbor)
+            else:
+                g[current] = math.inf
+                for neighbor in self.grid.adjacent(current) + [current]:
+                    self.update_vertex(neighbor)
+
+    def update_cells(self, changes):
+        # changes: iterable of (position, cost) with cost 0 blocking the cell
+        grid = self.grid
+        min_cost = grid.min_cost
+        touched = set()
+        for position, cost in changes:
+            index = grid.index(position)
+            if grid.costs[index] != cost:
+                grid.set_cost(position, cost)
+                touched.add(index)
+                touched.update(grid.adjacent(index))
+        if grid.min_cost < min_cost:
+            # the heuristic may now overestimate, so keys already queued are unusable
+            self.reset()
+            return
+        if touched:
+            self.km += grid.distance(self.last, self.start)
+            self.last = self.start
+            for index in touched:
+                self.update_vertex(index)
+
+    def move_to(self, position):
+        self.start = self.grid.index(position)
+
+    def replan(self):
+        self.expansions = 0
+        self.compute_shortest_path()
+        g, current, costs = self.g, self.start, self.grid.costs
+        if not (costs[current] and costs[self.goal]) or g.get(current, math.inf) == math.inf:
+            return None
+        path = [current]
+        while current != self.goal:
+            current = min(self.successors(current),
+                          key=lambda item: item[2] + g.get(item[0], math.inf))[0]
+            path.append(current)
+        return [self.grid.position(index) for index in path]
 
 class AStarSearch:
-    def __init__(self, start, goal, grid_size):
+    def __init__(self, start, goal, grid_size, grid=None, landmarks=None, node_budget=100000,
+                 table_budget=1 << 20):
         self.start, self.goal = start, goal
+        if grid is not None:
+            if grid_size is not None and tuple(grid_size) != (grid.width, grid.height):
+                raise ValueError("grid_size does not match the grid map dimensions.")
+            grid_size = (grid.width, grid.height)
+        self.grid = grid
         self.grid_width, self.grid_height = grid_size
+        if landmarks is not None and (landmarks.grid.width, landmarks.grid.height) != grid_size:
+            raise ValueError("Landmarks were built for a grid of a different size.")
+        self.landmarks = landmarks
         self.memo = {}
+        self.node_budget = node_budget
+        # cells the memory-bounded strategies may keep a best g for
+        self.table_budget = table_budget
+        self.expansions = 0
+        # cells passed over by Jump Point Search between the jump points it expands
+        self.scanned = 0
+        # filled in by the memory-bounded strategies
+        self.peak_nodes = self.reexpansions = 0
 
     def heuristic(self, pos):
         if pos not in self.memo:
@@ -25,7 +406,8 @@ class AStarSearch:
         moves = [(0,1), (1,0), (0,-1), (-1,0)]
         return [Node((node.position[0]+dx, node.position[1]+dy), node)
                 for dx, dy in moves
-                if 0 <= node.position[0]+dx < self.grid_width and 0 <= node.position[1]+dy < self.grid_height]
+                if 0 <= node.position[0]+dx < self.grid_width and 0 <= node.position[1]+dy < self.grid_height
+                and (self.grid is None or self.grid.passable((node.position[0]+dx, node.position[1]+dy)))]
 
     def reconstruct_path(self, node):
         path = []
@@ -34,30 +416,566 @@ class AStarSearch:
             node = node.parent
         return path[::-1]
 
-    def search(self):
-        open_set = [Node(self.start)]
+    @functools.cached_property
+    def cell_grid(self):
+        # The strategies below work on cell indices, so a plain grid_size gets an all-ones map
+        return self.grid if self.grid is not None else GridMap(self.grid_width, self.grid_height)
+
+    def cell_heuristic(self, target, reverse=False):
+        grid = self.cell_grid
+        target = grid.index(target)
+        if self.landmarks is not None:
+            return self.landmarks.heuristic(target, reverse)
+        return lambda index: grid.distance(index, target)
+
+    @functools.cached_property
+    def grid_heuristic(self):
+        return self.cell_heuristic(self.goal)
+
+    def search_ida(self):
+        # IDA*: depth-first probes bounded by f, keeping the current path in memory plus a
+        # table of at most table_budget cells with the lowest g any probe has reached them
+        # at, and which probe that was. A path reaching a cell at a higher g is pruned, and
+        # so is one reaching it at the same g again within a probe. A probe that fails
+        # leaves the lowest f beyond its bound as the next bound, so the search gives up
+        # once no reachable cell lies beyond it. Every expansion made by a probe that fails
+        # is repeated by the next, wider probe, so those are counted as re-expansions. The
+        # bound only rises to the next f on the frontier, so this suits near-open,
+        # uniform-cost maps; weighted maps make for many narrow probes.
+        grid, budget = self.cell_grid, self.table_budget
+        self.expansions = self.reexpansions = self.peak_nodes = 0
+        if not (grid.passable(self.start) and grid.passable(self.goal)):
+            return None
+        start, goal = grid.index(self.start), grid.index(self.goal)
+        if start == goal:
+            return [self.start]
+        heuristic = self.grid_heuristic
+        bound = heuristic(start)
+        best_g, probe = {}, 0
+
+        while True:
+            probe += 1
+            path, path_g, on_path = [start], [0], {start}
+            best_g[start] = (0, probe)
+            iterators = [grid.neighbors(start)]
+            expanded, minimum = 1, math.inf
+            while iterators:
+                for neighbor, _, cost in iterators[-1]:
+                    if neighbor in on_path:
+                        continue
+                    g = path_g[-1] + cost
+                    seen = best_g.get(neighbor)
+                    if seen is not None and (g > seen[0] or (g == seen[0] and seen[1] == probe)):
+                        continue
+                    f = g + heuristic(neighbor)
+                    if f > bound:
+                        minimum = min(minimum, f)
+                        continue
+                    path.append(neighbor)
+                    if neighbor == goal:
+                        self.expansions += expanded
+                        self.peak_nodes = max(self.peak_nodes, len(path) + len(best_g))
+                        return [grid.position(index) for index in path]
+                    if seen is not None or len(best_g) < budget:
+                        best_g[neighbor] = (g, probe)
+                    path_g.append(g)
+                    on_path.add(neighbor)
+                    iterators.append(grid.neighbors(neighbor))
+                    expanded += 1
+                    self.peak_nodes = max(self.peak_nodes, len(path) + len(best_g))
+                    break
+                else:
+                    iterators.pop()
+                    path_g.pop()
+                    on_path.discard(path.pop())
+            self.expansions += expanded
+            if minimum == math.inf:
+                return None
+            self.reexpansions += expanded
+            bound = minimum
+
+    def search_sma(self):
+        # SMA*: best-first with at most node_budget nodes in memory. When full, the
+        # shallowest highest-f leaf is forgotten and its f is backed up into its parent,
+        # which regenerates it if that part of the tree becomes the most promising again.
+        # Forgetting a node keeps the lowest g its cell was stored at and the cell it was
+        # reached from (in a table of at most table_budget cells), so only that step into
+        # the cell is ever stored again at that g: paths reaching it at a higher g, which
+        # includes every path back onto its own ancestors, or at the same g from elsewhere
+        # are not. Cells the table has no room for are only kept off their own path.
+        grid, budget = self.cell_grid, self.node_budget
+        self.expansions = self.reexpansions = self.peak_nodes = 0
+        if not (grid.passable(self.start) and grid.passable(self.goal)):
+            return None
+        goal, heuristic = grid.index(self.goal), self.grid_heuristic
+        counter = itertools.count()
+        open_heap, leaf_heap, best_by_cell, best_g = [], [], {}, {}
+
+        def make_node(index, parent, cost):
+            node = BoundedNode(index, parent)
+            node.g = parent.g + cost if parent is not None else 0
+            node.h = heuristic(index)
+            node.f = max(node.g + node.h, parent.f if parent is not None else 0)
+            if index != goal:
+                skip = parent.position if parent is not None else None
+                node.pending = [[node.g + c + heuristic(n), n, c, False]
+                                for n, _, c in grid.neighbors(index) if n != skip]
+            return node
+
+        def queue(node):
+            heapq.heappush(open_heap, (node.f, -node.depth, next(counter), node))
+            if not node.children:
+                heapq.heappush(leaf_heap, (-node.f, node.depth, next(counter), node))
+
+        def backup(node):
+            while node is not None and node.position != goal:
+                f = min([child.f for child in node.children] + [p[0] for p in node.pending],
+                        default=math.inf)
+                if max(f, node.f) == node.f:
+                    break
+                node.f = f
+                queue(node)
+                node = node.parent
+
+        def remove(node, remember):
+            nonlocal used
+            parent = node.parent
+            node.alive = False
+            used -= 1
+            parent.children.remove(node)
+            if best_by_cell.get(node.position) is node:
+                del best_by_cell[node.position]
+            if remember:
+                parent.pending.append([node.f, node.position, node.g - parent.g, True])
+            queue(parent)
+
+        def on_chain(node, index):
+            while node is not None:
+                if node.position == index:
+                    return True
+                node = node.parent
+            return False
+
+        def record(node):
+            if node.position in best_g or len(best_g) < self.table_budget:
+                parent = node.parent.position if node.parent is not None else None
+                best_g[node.position] = (node.g, parent)
+
+        def evict(keep):
+            skipped, evicted = [], False
+            while leaf_heap and not evicted:
+                entry = heapq.heappop(leaf_heap)
+                leaf = entry[3]
+                if not leaf.alive or leaf.children or -entry[0] != leaf.f:
+                    continue
+                if leaf is keep or leaf.parent is None:
+                    skipped.append(entry)
+                    continue
+                remove(leaf, remember=True)
+                evicted = True
+            for entry in skipped:
+                heapq.heappush(leaf_heap, entry)
+            return evicted
+
+        root = make_node(grid.index(self.start), None, 0)
+        best_by_cell[root.position] = root
+        record(root)
+        used = self.peak_nodes = 1
+        queue(root)
+        while True:
+            while open_heap:
+                f, _, _, node = open_heap[0]
+                if node.alive and f == node.f and (node.pending or node.position == goal):
+                    break
+                heapq.heappop(open_heap)
+            else:
+                return None
+            if node.f == math.inf:
+                return None
+            if node.position == goal:
+                return [grid.position(index) for index in self.reconstruct_path(node)]
+            self.expansions += 1
+
+            entry = min(node.pending)
+            node.pending.remove(entry)
+            estimate, index, cost, forgotten = entry
+            self.reexpansions += forgotten
+            child = make_node(index, node, cost)
+            child.f = max(child.f, estimate)
+            other, seen = best_by_cell.get(index), best_g.get(index)
+            if seen is not None:
+                dominated = child.g > seen[0] or (child.g == seen[0] and node.position != seen[1])
+            else:
+                dominated = on_chain(node, index)
+            dominated = dominated or (other is not None and other.alive and other.g <= child.g)
+            if not (dominated or (index != goal and (not child.pending or child.depth >= budget - 1))):
+                if used < budget or evict(keep=node):
+                    node.children.append(child)
+                    best_by_cell[index] = child
+                    record(child)
+                    used += 1
+                    self.peak_nodes = max(self.peak_nodes, used)
+                    queue(child)
+            # a node with nothing left to try is dropped; its parent backs up the rest
+            while node.parent is not None and not node.children and not node.pending:
+                parent = node.parent
+                remove(node, remember=False)
+                node = parent
+            backup(node)
+
+    @classmethod
+    def search_many(cls, queries, grid_size=None, grid=None, workers=None, strategy="astar",
+                    landmarks_path=None, chunksize=16):
+        # Yields the path (or None) for each (start, goal) query in submission order.
+        # The grid is copied into shared memory once and every worker maps it in place;
+        # landmark tables are loaded by each worker from landmarks_path via mmap.
+        shared, spec = None, None
+        if grid is not None:
+            shared = shared_memory.SharedMemory(create=True, size=max(len(grid.costs), 1))
+            shared.buf[:len(grid.costs)] = grid.costs
+            spec = (shared.name, grid.width, grid.height, grid.diagonal, grid.min_cost, grid.uniform)
+        try:
+            with multiprocessing.Pool(workers, initializer=init_search_worker,
+                                      initargs=(spec, grid_size, strategy, landmarks_path)) as pool:
+                yield from pool.imap(run_search_worker, queries, chunksize)
+        finally:
+            if shared is not None:
+                shared.close()
+                shared.unlink()
+
+    def reconstruct_grid_path(self, came_from, index):
+        grid = self.cell_grid
+        path = [grid.position(index)]
+        while came_from[index] & ~CLOSED:
+            index -= grid.offsets[(came_from[index] & ~CLOSED) - 1]
+            path.append(grid.position(index))
+        return path[::-1]
+
+    def search(self, strategy="astar"):
+        if strategy == "jps":
+            return self.search_jps()
+        if strategy == "bidirectional":
+            return self.search_bidirectional()
+        if strategy == "ida":
+            return self.search_ida()
+        if strategy == "sma":
+            return self.search_sma()
+        if strategy == "nodes":
+            return self.search_nodes()
+        if strategy != "astar":
+            raise ValueError(f"Unknown search strategy: {strategy!r}")
+        if self.grid is not None:
+            return self.search_grid()
+        return self.search_nodes()
+
+    def search_nodes(self):
+        # A* over Node objects in an OpenSet, which search uses for a plain grid_size. On a
+        # GridMap it steps around obstacles, so only 4-connected uniform-cost maps apply.
+        grid = self.grid
+        self.expansions = 0
+        if grid is not None:
+            if grid.diagonal or not grid.uniform:
+                raise ValueError("The node engine requires a 4-connected uniform-cost grid.")
+            if not (grid.passable(self.start) and grid.passable(self.goal)):
+                return None
+        start = Node(self.start)
+        start.h = start.f = self.heuristic(self.start)
+        open_set = OpenSet()
+        open_set.push(start)
         closed_set = set()
 
         while open_set:
-            current = heapq.heappop(open_set)
+            current = open_set.pop()
             if current.position == self.goal:
                 return self.reconstruct_path(current)
             closed_set.add(current.position)
+            self.expansions += 1
 
             for neighbor in self.get_neighbors(current):
                 if neighbor.position in closed_set:
                     continue
                 tentative_g = current.g + 1
-                in_open = next((n for n in open_set if n.position == neighbor.position), None)
-                if not in_open or tentative_g < neighbor.g:
+                in_open = open_set.get(neighbor.position)
+                if in_open is None or tentative_g < in_open.g:
                     neighbor.g = tentative_g
                     neighbor.h = self.heuristic(neighbor.position)
                     neighbor.f = neighbor.g + neighbor.h
                     neighbor.parent = current
-                    if not in_open:
-                        heapq.heappush(open_set, neighbor)
+                    open_set.push(neighbor)
+        return None
+
+    def search_grid(self):
+        # Flat per-cell arrays instead of Node objects: a float g-score and one byte
+        # holding the move that reached the cell (plus the CLOSED flag).
+        grid = self.cell_grid
+        self.expansions = 0
+        if not (grid.passable(self.start) and grid.passable(self.goal)):
+            return None
+        start, goal = grid.index(self.start), grid.index(self.goal)
+        g_score = array('d', [math.inf]) * len(grid.costs)
+        came_from = bytearray(len(grid.costs))
+        g_score[start] = 0
+        h = self.grid_heuristic(start)
+        open_heap = [(h, h, start)]
+
+        while open_heap:
+            _, _, current = heapq.heappop(open_heap)
+            if came_from[current] & CLOSED:
+                continue
+            if current == goal:
+                return self.reconstruct_grid_path(came_from, current)
+            came_from[current] |= CLOSED
+            self.expansions += 1
+
+            g = g_score[current]
+            for neighbor, move, cost in grid.neighbors(current):
+                tentative_g = g + cost
+                if tentative_g < g_score[neighbor] and not came_from[neighbor] & CLOSED:
+                    g_score[neighbor] = tentative_g
+                    came_from[neighbor] = move + 1
+                    h = self.grid_heuristic(neighbor)
+                    heapq.heappush(open_heap, (tentative_g + h, h, neighbor))
+        return None
+
+    def search_jps(self):
+        # Jump Point Search (no corner cutting) over uniform-cost cells; only jump points
+        # are expanded and the straight runs between them are filled back into the path.
+        # The cells the jumps pass over are counted in scanned.
+        grid = self.cell_grid
+        if not grid.uniform:
+            raise ValueError("Jump Point Search requires a uniform-cost grid.")
+        self.expansions = self.scanned = 0
+        if not (grid.passable(self.start) and grid.passable(self.goal)):
+            return None
+        width, height, costs, diagonal = grid.width, grid.height, grid.costs, grid.diagonal
+        rows = grid.walk_rows
+        columns = grid.walk_columns if diagonal else None
+        goal, min_cost = self.goal, grid.min_cost
+
+        def walkable(x, y):
+            return 0 <= x < width and 0 <= y < height and costs[y * width + x] != 0
+
+        def scan(data, span, line, pos, step, target):
+            # Position of the first jump point on a straight run along one line of data, or
+            # None. A run stops at the target or at the first cell with a forced neighbor,
+            # i.e. one whose side neighbor is open while the side cell behind it is not;
+            # both show up as a 0,1 pair in the side line, read in the direction of travel.
+            nonlocal scanned
+            above = line * span
+            below = above + 2 * span
+            if step > 0:
+                end = data.find(b"\0", above + span + pos + 1, below) - above - span - 1
+                found = end
+                forced = data.find(b"\0\1", above + pos, above + end + 1) - above
+                if 0 <= forced < found:
+                    found = forced
+                forced = data.find(b"\0\1", below + pos, below + end + 1) - below
+                if 0 <= forced < found:
+                    found = forced
+                if pos <= target < found:
+                    found = target
+                if found < end:
+                    scanned += found + 1 - pos
+                    return found
+                scanned += end - pos
+            else:
+                end = data.rfind(b"\0", above + span, above + span + pos + 2) - above - span - 1
+                found = end
+                forced = data.rfind(b"\1\0", above + end + 2, above + pos + 3) - above - 1
+                if forced > found:
+                    found = forced
+                forced = data.rfind(b"\1\0", below + end + 2, below + pos + 3) - below - 1
+                if forced > found:
+                    found = forced
+                if found < target <= pos:
+                    found = target
+                if found > end:
+                    scanned += pos + 1 - found
+                    return found
+                scanned += pos - end
+            return None
+
+        def across(x, y, dx):
+            return scan(rows, width + 2, y, x, dx, goal[0] if goal[1] == y else -2)
+
+        def along(x, y, dy):
+            return scan(columns, height + 2, x, y, dy, goal[1] if goal[0] == x else -2)
+
+        def jump(x, y, dx, dy):
+            nonlocal scanned
+            if not dy:
+                found = across(x, y, dx)
+                return None if found is None else (found, y)
+            if not dx and diagonal:
+                found = along(x, y, dy)
+                return None if found is None else (x, found)
+            while walkable(x, y):
+                scanned += 1
+                if (x, y) == goal:
+                    return (x, y)
+                if dx:
+                    if across(x + dx, y, dx) is not None or along(x, y + dy, dy) is not None:
+                        return (x, y)
+                    if not (walkable(x + dx, y) and walkable(x, y + dy)):
+                        return None
+                else:
+                    if ((walkable(x - 1, y) and not walkable(x - 1, y - dy)) or
+                            (walkable(x + 1, y) and not walkable(x + 1, y - dy))):
+                        return (x, y)
+                    # 4-connected vertical runs also stop wherever a sideways run would
+                    if across(x + 1, y, 1) is not None or across(x - 1, y, -1) is not None:
+                        return (x, y)
+                x, y = x + dx, y + dy
+            return None
+
+        def successors(x, y, dx, dy):
+            if not (dx or dy):
+                return [grid.position(n) for n, _, _ in grid.neighbors(y * width + x)]
+            candidates = []
+            if diagonal and dx and dy:
+                vertical, horizontal = walkable(x, y + dy), walkable(x + dx, y)
+                candidates = [(x, y + dy)] * vertical + [(x + dx, y)] * horizontal
+                if vertical and horizontal:
+                    candidates.append((x + dx, y + dy))
+            elif dx:
+                ahead, up, down = walkable(x + dx, y), walkable(x, y + 1), walkable(x, y - 1)
+                candidates = [(x + dx, y)] * ahead + [(x, y + 1)] * up + [(x, y - 1)] * down
+                if diagonal and ahead:
+                    candidates += [(x + dx, y + 1)] * up + [(x + dx, y - 1)] * down
+            else:
+                ahead, right, left = walkable(x, y + dy), walkable(x + 1, y), walkable(x - 1, y)
+                candidates = [(x, y + dy)] * ahead + [(x + 1, y)] * right + [(x - 1, y)] * left
+                if diagonal and ahead:
+                    candidates += [(x + 1, y + dy)] * right + [(x - 1, y + dy)] * left
+            return candidates
+
+        def distance(a, b):
+            dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
+            if diagonal:
+                return (dx + dy + (SQRT2 - 2) * min(dx, dy)) * min_cost
+            return (dx + dy) * min_cost
+
+        scanned = 0
+        g_score, parents, closed = {self.start: 0}, {self.start: None}, set()
+        h = distance(self.start, goal)
+        open_heap = [(h, h, self.start)]
+        while open_heap:
+            _, _, current = heapq.heappop(open_heap)
+            if current in closed:
+                continue
+            if current == goal:
+                self.scanned = scanned
+                return self.reconstruct_jump_path(parents, current)
+            closed.add(current)
+            self.expansions += 1
+
+            x, y = current
+            parent = parents[current]
+            dx = dy = 0
+            if parent is not None:
+                dx, dy = (x > parent[0]) - (x < parent[0]), (y > parent[1]) - (y < parent[1])
+            g = g_score[current]
+            for nx, ny in successors(x, y, dx, dy):
+                point = jump(nx, ny, nx - x, ny - y)
+                if point is None or point in closed:
+                    continue
+                tentative_g = g + distance(current, point)
+                if tentative_g < g_score.get(point, math.inf):
+                    g_score[point] = tentative_g
+                    parents[point] = current
+                    h = distance(point, goal)
+                    heapq.heappush(open_heap, (tentative_g + h, h, point))
+        self.scanned = scanned
         return None
 
+    def reconstruct_jump_path(self, parents, point):
+        path = [point]
+        while parents[point] is not None:
+            (x, y), parent = point, parents[point]
+            dx, dy = (parent[0] > x) - (parent[0] < x), (parent[1] > y) - (parent[1] < y)
+            while (x, y) != parent:
+                x, y = x + dx, y + dy
+                path.append((x, y))
+            point = parent
+        return path[::-1]
+
+    def search_bidirectional(self):
+        # Forward search from start and backward search from goal, each with a consistent
+        # heuristic toward the other end; stops once either frontier can no longer beat
+        # the best meeting point found so far.
+        grid = self.cell_grid
+        self.expansions = 0
+        if not (grid.passable(self.start) and grid.passable(self.goal)):
+            return None
+        start, goal = grid.index(self.start), grid.index(self.goal)
+        if start == goal:
+            return [self.start]
+        size = len(grid.costs)
+        g_score = (array('d', [math.inf]) * size, array('d', [math.inf]) * size)
+        came_from = (bytearray(size), bytearray(size))
+        heuristics = (self.grid_heuristic, self.cell_heuristic(self.start, reverse=True))
+        g_score[0][start] = g_score[1][goal] = 0
+        h_start, h_goal = heuristics[0](start), heuristics[1](goal)
+        heaps = ([(h_start, h_start, start)], [(h_goal, h_goal, goal)])
+        best, meet = math.inf, None
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] >= best or heaps[1][0][0] >= best:
+                break
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, _, current = heapq.heappop(heaps[side])
+            own_g, own_came_from = g_score[side], came_from[side]
+            if own_came_from[current] & CLOSED:
+                continue
+            own_came_from[current] |= CLOSED
+            self.expansions += 1
+
+            other_g, heuristic = g_score[1 - side], heuristics[side]
+            g = own_g[current]
+            for neighbor, move, cost in grid.neighbors(current, reverse=side == 1):
+                tentative_g = g + cost
+                if tentative_g < own_g[neighbor] and not own_came_from[neighbor] & CLOSED:
+                    own_g[neighbor] = tentative_g
+                    own_came_from[neighbor] = move + 1
+                    h = heuristic(neighbor)
+                    heapq.heappush(heaps[side], (tentative_g + h, h, neighbor))
+                    if tentative_g + other_g[neighbor] < best:
+                        best, meet = tentative_g + other_g[neighbor], neighbor
+
+        if meet is None:
+            return None
+        forward = self.reconstruct_grid_path(came_from[0], meet)
+        backward = self.reconstruct_grid_path(came_from[1], meet)
+        return forward + backward[-2::-1]
+
+worker_state = {}
+
+def init_search_worker(spec, grid_size, strategy, landmarks_path):
+    grid = None
+    if spec is not None:
+        name, width, height, diagonal, min_cost, uniform = spec
+        shared = shared_memory.SharedMemory(name=name)
+        grid = GridMap(width, height, shared.buf[:width * height], diagonal)
+        grid.min_cost, grid.uniform = min_cost, uniform
+        worker_state["shared"] = shared
+        util.Finalize(None, close_search_worker, exitpriority=10)
+        grid_size = None
+    landmarks = None
+    if landmarks_path is not None:
+        landmarks = Landmarks.load(landmarks_path, grid if grid is not None else GridMap(*grid_size))
+    worker_state.update(grid=grid, grid_size=grid_size, strategy=strategy, landmarks=landmarks)
+
+def close_search_worker():
+    # the grid's view into the block has to go before the block itself can close
+    worker_state.pop("grid").costs.release()
+    worker_state.pop("shared").close()
+
+def run_search_worker(query):
+    start, goal = query
+    astar = AStarSearch(start, goal, worker_state["grid_size"], grid=worker_state["grid"],
+                        landmarks=worker_state["landmarks"])
+    return astar.search(worker_state["strategy"])
+
 def get_input():
     def parse_tuple(s):
         x, y = map(int, s.strip().split(','))
@@ -72,10 +990,56 @@ def get_input():
 
     return start, goal, grid_size
 
+def benchmark(sizes=(100, 250, 500, 1000, 2000, 4000), strategies=("nodes", "astar")):
+    # "open" runs corner to corner on an empty grid, where ties on f keep the frontier
+    # small; "band" has to get around a wall across the middle with its gap at the far
+    # end, so most of the upper half is searched and the open set grows with the grid.
+    # "nodes" is the Node/OpenSet engine, "astar" the flat-array one used on a GridMap;
+    # scanned counts the cells Jump Point Search passes over between expansions
+    print(f"{'grid':>11} {'query':>6} {'strategy':>13} {'expansions':>11} {'scanned':>11} "
+          f"{'seconds':>9} {'exp/sec':>11}")
+    for n in sizes:
+        band = GridMap(n, n)
+        band.costs[n // 2 * n:n // 2 * n + n - 1] = bytes(n - 1)
+        for query, goal, grid in (("open", (n - 1, n - 1), GridMap(n, n)), ("band", (0, n - 1), band)):
+            for strategy in strategies:
+                astar = AStarSearch((0, 0), goal, (n, n), grid=grid)
+                started = time.perf_counter()
+                astar.search(strategy)
+                elapsed = time.perf_counter() - started
+                rate = astar.expansions / elapsed if elapsed else float("inf")
+                print(f"{f'{n}x{n}':>11} {query:>6} {strategy:>13} {astar.expansions:>11} "
+                      f"{astar.scanned:>11} {elapsed:>9.3f} {rate:>11.0f}")
+
+def regression_check(budgets=range(8, 31), strategies=("ida", "sma")):
+    # a small weighted diagonal map whose goal is walled off: the memory-bounded
+    # strategies used to keep re-expanding its 40 reachable cells without end when
+    # their budget was below that, rather than giving up with no path
+    unreachable = GridMap(11, 5, bytearray.fromhex(
+        "07000205020302020301020601060308020306000003010900050606050300070406020801050009"
+        "000408000501000008070005000000"), True)
+    failures = 0
+    for grid, start, goal in ((unreachable, (10, 1), (7, 4)),):
+        expected = AStarSearch(start, goal, None, grid=grid).search()
+        for strategy in strategies:
+            for budget in budgets:
+                astar = AStarSearch(start, goal, None, grid=grid, node_budget=budget)
+                path = astar.search(strategy)
+                ok = path == expected if expected is None else (
+                    path is not None and path[0] == start and path[-1] == goal)
+                failures += not ok
+                print(f"{strategy:>5} {budget:>4} {astar.expansions:>9} {'ok' if ok else 'FAIL'}")
+    return failures
+
 if __name__ == "__main__":
-    start, goal, grid_size = get_input()
-    astar = AStarSearch(start, goal, grid_size)
-    path = astar.search()
-    print("Path found:" if path else "No path found.")
-    if path:
-        print(path)
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(strategies=sys.argv[2:] or ("nodes", "astar"))
+    elif sys.argv[1:] == ["--check"]:
+        sys.exit(1 if regression_check() else 0)
+    else:
+        start, goal, grid_size = get_input()
+        astar = AStarSearch(start, goal, grid_size)
+        path = astar.search()
+        print("Path found:" if path else "No path found.")
+        if path:
+            print(path)
@@ -1,3 +1,10 @@
+import itertools
+import math
+import sys
+import time
+from collections import defaultdict
+
+
 class Rule:
     def __init__(self, conclusion, conditions):
         self.conclusion = conclusion
@@ -12,11 +19,17 @@ class KnowledgeBase:
     def __init__(self):
         self.facts = {}
         self.rules = []
+        # conclusion -> rules concluding it, covering the first indexed_rules of self.rules,
+        # and the goals already settled by backward_chain
+        self.rules_by_conclusion = defaultdict(list)
+        self.indexed_rules = 0
+        self.table = {}
 
     def add_fact(self, name, value):
         if not isinstance(value, bool):
             raise ValueError("Fact value must be a boolean (True or False).")
         self.facts[name] = value
+        self.table.clear()
         print(f"Fact added: {name} is {value}")
 
     def add_rule(self, conclusion, conditions):
@@ -24,6 +37,7 @@ class KnowledgeBase:
             raise ValueError("Conditions must be a list of strings.")
         rule = Rule(conclusion, conditions)
         self.rules.append(rule)
+        self.table.clear()
         print(f"Rule added: {rule}")
 
     def display_facts(self):
@@ -42,35 +56,71 @@ class KnowledgeBase:
         for i, rule in enumerate(self.rules):
             print(f"- Rule {i+1}: {rule}")
 
-    def backward_chain(self, goal, _being_proved=None):
-        if _being_proved is None:
-            _being_proved = set()
-
-        if goal in self.facts:
-            return self.facts[goal]
-
-        if goal in _being_proved:
-            return False
-
-        _being_proved.add(goal)
-
-        for rule in self.rules:
-            if rule.conclusion == goal:
-                all_conditions_true = True
-                if not rule.conditions:
-                    pass
-
+    def index_rules(self):
+        # rules appended straight to self.rules are picked up here
+        if self.indexed_rules < len(self.rules):
+            for rule in self.rules[self.indexed_rules:]:
+                self.rules_by_conclusion[rule.conclusion].append(rule)
+            self.indexed_rules = len(self.rules)
+            self.table.clear()
+
+    def backward_chain(self, goal):
+        # Tabled search with SCC completion, as in Tarjan's algorithm: goals are numbered
+        # as they are first reached and stay unsettled until their SCC completes. Reaching
+        # an unsettled goal again counts it as false for now, and callers learn the lowest
+        # number they relied on. A goal that fails relying on nothing numbered before it
+        # leads its SCC: if a goal the SCC assumed false was proved meanwhile, the SCC is
+        # searched again, otherwise every goal in it still unsettled is false. Proofs are
+        # tabled as soon as they are found.
+        self.index_rules()
+        facts, table, rules_by_conclusion = self.facts, self.table, self.rules_by_conclusion
+        index, stack, assumed, revised = {}, [], set(), []
+        counter = itertools.count()
+
+        def prove(goal):
+            if goal in facts:
+                return facts[goal], math.inf
+            if goal in table:
+                return table[goal], math.inf
+            if goal in index:
+                assumed.add(goal)
+                return False, index[goal]
+
+            number = index[goal] = next(counter)
+            position = len(stack)
+            stack.append(goal)
+            low = math.inf
+            for rule in rules_by_conclusion.get(goal, ()):
                 for condition in rule.conditions:
-                    if not self.backward_chain(condition, _being_proved):
-                        all_conditions_true = False
+                    holds, relied_on = prove(condition)
+                    low = min(low, relied_on)
+                    if not holds:
                         break
-
-                if all_conditions_true:
-                    _being_proved.remove(goal)
-                    return True
-
-        _being_proved.remove(goal)
-        return False
+                else:
+                    table[goal] = True
+                    del index[goal]
+                    if goal in assumed:
+                        revised.append(number)
+                    # goals left unsettled below still rely on what this one's search did
+                    return True, low
+            if low < number:
+                return False, low
+
+            members = stack[position:]
+            del stack[position:]
+            assumed.difference_update(members)
+            if any(proved >= number for proved in revised):
+                revised[:] = [proved for proved in revised if proved < number]
+                for member in members:
+                    index.pop(member, None)
+                return prove(goal)
+            for member in members:
+                if member in index:
+                    table[member] = False
+                    del index[member]
+            return False, math.inf
+
+        return prove(goal)[0]
 
 def get_user_facts(kb):
     print("\n--- Enter Facts ---")
@@ -161,6 +211,25 @@ def main():
     else:
         print(f"\nFAILURE: The goal '{goal}' cannot be achieved.")
 
+def benchmark(layers=2000, width=3):
+    # layers of goals where every goal needs every goal of the next layer, all failing at
+    # the bottom: exponential without tabling
+    kb = KnowledgeBase()
+    for layer in range(layers):
+        for i in range(width):
+            kb.rules.append(Rule(f"g{layer}_{i}", [f"g{layer + 1}_{j}" for j in range(width)]))
+            kb.rules.append(Rule(f"g{layer}_{i}", [f"g{layer + 1}_{(i + 1) % width}", "missing"]))
+    kb.rules.append(Rule(f"g{layers}_0", ["g0_0"]))
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * layers + 100))
+    for goal in ("g0_0", f"g{layers // 2}_1"):
+        start = time.perf_counter()
+        result = kb.backward_chain(goal)
+        print(f"backward_chain({goal!r}) = {result} with {len(kb.table)} tabled goals "
+              f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--benchmark"]:
+        benchmark()
+    else:
+        main()
     
\ No newline at end of file
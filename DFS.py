@@ -1,19 +1,179 @@
-from typing import List, Set
-from collections import defaultdict
+import mmap
+import random
+import struct
+import sys
+import time
+import zlib
+from array import array
+from itertools import accumulate, chain
+from typing import Iterable, Iterator, List, Sequence, Set, Tuple, Union
+from collections import Counter, defaultdict
+
+try:
+    import numpy
+except ImportError:  # from_edges falls back to a counting-sort loop, well short of bulk-load rates
+    numpy = None
+
+# edges per second from_edges is expected to load at; only the NumPy path gets there
+LOAD_TARGET = 1_000_000
+
+# magic, format version, flags (1 = directed, 2 = big-endian arrays), vertices,
+# neighbor count and CRC-32 of the offsets and neighbors arrays that follow
+GRAPH_HEADER = struct.Struct("<4sBBxxQQI4x")
+GRAPH_MAGIC = b"DFSG"
+
+
+class CSRAdjacency:
+    """Immutable compressed sparse row adjacency: the neighbors of node u are
+    neighbors[offsets[u]:offsets[u + 1]]"""
+    offsets: Sequence[int]
+    neighbors: Sequence[int]
+
+    def __init__(self, offsets: Sequence[int], neighbors: Sequence[int]) -> None:
+        self.offsets = offsets
+        self.neighbors = neighbors
+
+    def __getitem__(self, node: int) -> Sequence[int]:
+        return self.neighbors[self.offsets[node]:self.offsets[node + 1]]
+
+    def get(self, node: int, default: Sequence[int] = ()) -> Sequence[int]:
+        if 0 <= node < len(self.offsets) - 1:
+            return self[node]
+        return default
+
+    def items(self) -> Iterator[Tuple[int, Sequence[int]]]:
+        """Yields the nodes that have neighbors, as a defaultdict graph would"""
+        offsets = self.offsets
+        for node in range(len(offsets) - 1):
+            if offsets[node] != offsets[node + 1]:
+                yield node, self[node]
+
 
 class Graph:
     vertices: int
-    graph: defaultdict[int, List[int]]
+    directed: bool
+    graph: Union[defaultdict[int, List[int]], CSRAdjacency]
 
-    def __init__(self, vertices: int) -> None:
+    def __init__(self, vertices: int, directed: bool = False) -> None:
         self.vertices = vertices
+        self.directed = directed
         self.graph = defaultdict(list)
 
+    @classmethod
+    def from_edges(cls, vertices: int, edges: Union[array, Iterable[Tuple[int, int]]],
+                   directed: bool = False) -> "Graph":
+        """Builds an immutable CSR graph from (u, v) pairs or a flat u0, v0, u1, v1, ... array;
+        bulk loads need NumPy to reach LOAD_TARGET edges per second"""
+        flat = edges if isinstance(edges, array) else array("i", chain.from_iterable(edges))
+        if len(flat) % 2:
+            raise ValueError("Edge array must hold an even number of endpoints.")
+        if numpy is not None:
+            ends = numpy.asarray(flat)
+            low, high = (int(ends.min()), int(ends.max())) if flat else (0, -1)
+        else:
+            low, high = (min(flat), max(flat)) if flat else (0, -1)
+        if low < 0 or high >= vertices:
+            raise ValueError("Edge endpoint out of bounds.")
+
+        # Stable sort by source, keeping edge order so neighbors match add_edge order
+        if numpy is not None:
+            sources = ends[0::2] if directed else ends
+            targets = ends[1::2] if directed else ends.reshape(-1, 2)[:, ::-1].ravel()
+            degree = numpy.bincount(sources, minlength=vertices)
+            offsets = array("q", numpy.concatenate(([0], numpy.cumsum(degree))).astype(numpy.int64).tobytes())
+            order = numpy.argsort(sources, kind="stable")
+            neighbors = array("i", targets[order].astype(numpy.int32).tobytes())
+        else:
+            degree = Counter(flat[0::2] if directed else flat)
+            offsets = array("q", accumulate((degree[node] for node in range(vertices)), initial=0))
+            neighbors = array("i", bytes(4 * offsets[-1]))
+            position = offsets.tolist()
+            if directed:
+                for u, v in zip(flat[0::2], flat[1::2]):
+                    neighbors[position[u]] = v
+                    position[u] += 1
+            else:
+                for u, v in zip(flat[0::2], flat[1::2]):
+                    neighbors[position[u]] = v
+                    position[u] += 1
+                    neighbors[position[v]] = u
+                    position[v] += 1
+
+        graph = cls(vertices, directed)
+        graph.graph = CSRAdjacency(offsets, neighbors)
+        return graph
+
+    @classmethod
+    def from_edge_file(cls, path: str, vertices: Union[int, None] = None,
+                       directed: bool = False) -> "Graph":
+        """Loads whitespace-separated "u v" pairs; vertices defaults to the largest id + 1"""
+        flat = array("i")
+        with open(path, "rb") as f:
+            tail = b""
+            while chunk := f.read(1 << 24):
+                chunk = tail + chunk
+                tokens = chunk.split()
+                tail = b"" if chunk[-1:].isspace() or not tokens else tokens.pop()
+                flat.extend(map(int, tokens))
+            if tail:
+                flat.append(int(tail))
+        if vertices is None:
+            vertices = max(flat) + 1 if flat else 0
+        return cls.from_edges(vertices, flat, directed)
+
+    @classmethod
+    def load(cls, path: str, verify: bool = False) -> "Graph":
+        """Memory-maps a file written by save; the arrays are read in place, so processes
+        loading the same file share its page cache. verify checks the CRC-32 first."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buffer) < GRAPH_HEADER.size:
+            raise ValueError(f"{path} is too short to be a graph file.")
+        magic, version, flags, vertices, entries, checksum = GRAPH_HEADER.unpack_from(buffer)
+        if magic != GRAPH_MAGIC or version != 1:
+            raise ValueError(f"{path} is not a version 1 graph file.")
+        if bool(flags & 2) != (sys.byteorder == "big"):
+            raise ValueError(f"{path} was written on a machine with a different byte order.")
+        start = GRAPH_HEADER.size
+        middle = start + 8 * (vertices + 1)
+        if len(buffer) != middle + 4 * entries:
+            raise ValueError(f"{path} is truncated or has trailing data.")
+
+        view = memoryview(buffer)
+        offsets, neighbors = view[start:middle].cast("q"), view[middle:].cast("i")
+        if verify and zlib.crc32(neighbors, zlib.crc32(offsets)) != checksum:
+            raise ValueError(f"{path} failed its checksum.")
+        graph = cls(vertices, bool(flags & 1))
+        graph.graph = CSRAdjacency(offsets, neighbors)
+        return graph
+
+    def save(self, path: str) -> None:
+        """Writes the graph in the binary CSR format read by load"""
+        adjacency = self.to_csr()
+        offsets, neighbors = adjacency.offsets, adjacency.neighbors
+        flags = (1 if self.directed else 0) | (2 if sys.byteorder == "big" else 0)
+        checksum = zlib.crc32(neighbors, zlib.crc32(offsets))
+        with open(path, "wb") as f:
+            f.write(GRAPH_HEADER.pack(GRAPH_MAGIC, 1, flags, self.vertices, len(neighbors), checksum))
+            f.write(offsets)
+            f.write(neighbors)
+
+    def to_csr(self) -> CSRAdjacency:
+        """The adjacency as CSR arrays, converting a defaultdict graph without modifying it"""
+        if isinstance(self.graph, CSRAdjacency):
+            return self.graph
+        rows = [self.graph.get(node, ()) for node in range(self.vertices)]
+        offsets = array("q", accumulate(map(len, rows), initial=0))
+        return CSRAdjacency(offsets, array("i", chain.from_iterable(rows)))
+
     def add_edge(self, u: int, v: int) -> None:
         """Adds edges to the graph"""
+        if isinstance(self.graph, CSRAdjacency):
+            raise TypeError("CSR graphs are immutable; build them with from_edges.")
         if 0 <= u < self.vertices and 0 <= v < self.vertices:
             self.graph[u].append(v)
-            self.graph[v].append(u)
+            if not self.directed:
+                self.graph[v].append(u)
             print(f"Edge added: ({u}, {v})")
 
     def walk(self, node: int, visited: Set) -> None:
@@ -25,17 +185,195 @@ class Graph:
             if adj not in visited:
                 self.walk(adj, visited)
 
+    def traverse(self, start_node: int = 0, order: str = "pre",
+                 all_components: bool = False) -> Iterator[int]:
+        """Lazily yields nodes in the order walk visits them, using an explicit stack"""
+        if order not in ("pre", "post"):
+            raise ValueError("Order must be 'pre' or 'post'.")
+        if not 0 <= start_node < self.vertices:
+            raise ValueError("Start node is out of bounds.")
+        pre = order == "pre"
+        adjacency = self.graph
+        visited = bytearray(self.vertices)
+        roots = chain((start_node,), range(self.vertices)) if all_components else (start_node,)
+
+        for root in roots:
+            if visited[root]:
+                continue
+            visited[root] = 1
+            if pre:
+                yield root
+            stack = [(root, iter(adjacency.get(root, ())))]
+            while stack:
+                node, neighbors = stack[-1]
+                for adj in neighbors:
+                    if not visited[adj]:
+                        visited[adj] = 1
+                        if pre:
+                            yield adj
+                        stack.append((adj, iter(adjacency.get(adj, ()))))
+                        break
+                else:
+                    stack.pop()
+                    if not pre:
+                        yield node
+
     def dfs(self, start_node: int) -> None:
         """Performs DFS (Depth First Search) traversal"""
         if start_node >= self.vertices:
             print("Start node is out of bounds.")
             return
 
-        visited = set()
         print(f"DFS starting from node: {start_node}")
-        self.walk(start_node, visited)
+        for node in self.traverse(start_node):
+            print(node, end=" ")
         print()
 
+    def _require(self, directed: bool, name: str) -> None:
+        if self.directed != directed:
+            raise ValueError(f"{name} only works on {'directed' if directed else 'undirected'} graphs.")
+
+    def connected_components(self) -> array:
+        """Component label of every node, numbered in order of their smallest node"""
+        self._require(False, "connected_components")
+        adjacency = self.graph
+        labels = array("i", [-1]) * self.vertices
+        count = 0
+        for root in range(self.vertices):
+            if labels[root] != -1:
+                continue
+            labels[root] = count
+            stack = [root]
+            while stack:
+                for adj in adjacency.get(stack.pop(), ()):
+                    if labels[adj] == -1:
+                        labels[adj] = count
+                        stack.append(adj)
+            count += 1
+        return labels
+
+    def strongly_connected_components(self) -> array:
+        """Tarjan's algorithm; SCC label of every node, in reverse topological order"""
+        adjacency = self.graph
+        index = array("i", [-1]) * self.vertices
+        low = array("i", [0]) * self.vertices
+        labels = array("i", [-1]) * self.vertices
+        on_stack = bytearray(self.vertices)
+        stack: List[int] = []
+        counter = count = 0
+
+        for root in range(self.vertices):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(adjacency.get(root, ())))]
+            while work:
+                node, neighbors = work[-1]
+                for adj in neighbors:
+                    if index[adj] == -1:
+                        index[adj] = low[adj] = counter
+                        counter += 1
+                        stack.append(adj)
+                        on_stack[adj] = 1
+                        work.append((adj, iter(adjacency.get(adj, ()))))
+                        break
+                    if on_stack[adj] and index[adj] < low[node]:
+                        low[node] = index[adj]
+                else:
+                    work.pop()
+                    if work and low[node] < low[work[-1][0]]:
+                        low[work[-1][0]] = low[node]
+                    if low[node] == index[node]:
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            labels[member] = count
+                            if member == node:
+                                break
+                        count += 1
+        return labels
+
+    def _low_links(self) -> Tuple[array, array]:
+        """Bridges (as flat u, v pairs) and articulation points of an undirected graph"""
+        adjacency = self.graph
+        disc = array("i", [-1]) * self.vertices
+        low = array("i", [0]) * self.vertices
+        is_cut = bytearray(self.vertices)
+        bridges = array("i")
+        timer = 0
+
+        for root in range(self.vertices):
+            if disc[root] != -1:
+                continue
+            disc[root] = low[root] = timer
+            timer += 1
+            root_children = 0
+            # frame: node, parent, whether the edge back to parent was skipped, neighbors
+            work = [[root, -1, False, iter(adjacency.get(root, ()))]]
+            while work:
+                frame = work[-1]
+                node = frame[0]
+                for adj in frame[3]:
+                    if adj == frame[1] and not frame[2]:
+                        frame[2] = True
+                        continue
+                    if disc[adj] == -1:
+                        disc[adj] = low[adj] = timer
+                        timer += 1
+                        work.append([adj, node, False, iter(adjacency.get(adj, ()))])
+                        break
+                    if disc[adj] < low[node]:
+                        low[node] = disc[adj]
+                else:
+                    work.pop()
+                    if not work:
+                        continue
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                    if low[node] > disc[parent]:
+                        bridges.extend((parent, node))
+                    if parent == root:
+                        root_children += 1
+                    elif low[node] >= disc[parent]:
+                        is_cut[parent] = 1
+            if root_children > 1:
+                is_cut[root] = 1
+        return bridges, array("i", (node for node in range(self.vertices) if is_cut[node]))
+
+    def bridges(self) -> array:
+        """Bridge edges as a flat array of u, v pairs (parallel edges are never bridges)"""
+        self._require(False, "bridges")
+        return self._low_links()[0]
+
+    def articulation_points(self) -> array:
+        """Cut vertices in increasing order"""
+        self._require(False, "articulation_points")
+        return self._low_links()[1]
+
+    def topological_sort(self) -> array:
+        """Kahn's algorithm; raises ValueError when the graph has a cycle"""
+        self._require(True, "topological_sort")
+        adjacency = self.graph
+        indegree = array("i", [0]) * self.vertices
+        for _, neighbors in adjacency.items():
+            for adj in neighbors:
+                indegree[adj] += 1
+        order = array("i", (node for node in range(self.vertices) if not indegree[node]))
+        position = 0
+        while position < len(order):
+            for adj in adjacency.get(order[position], ()):
+                indegree[adj] -= 1
+                if not indegree[adj]:
+                    order.append(adj)
+            position += 1
+        if len(order) != self.vertices:
+            raise ValueError("Graph has a cycle, so it has no topological order.")
+        return order
+
     def show_graph(self) -> None:
         """To print the graph"""
         print("\nGraph:")
@@ -44,18 +382,53 @@ class Graph:
             print(f"{node} → {neighbors_str if neighbors else 'No connections'}")
 
 
+def benchmark(vertices: int = 1_000_000, edges: int = 2_000_000, seed: int = 0) -> None:
+    """Times graph loading and each analysis on random synthetic graphs"""
+    rng = random.Random(seed)
+    flat = array("i", (rng.randrange(vertices) for _ in range(2 * edges)))
+    for directed in (False, True):
+        started = time.perf_counter()
+        graph = Graph.from_edges(vertices, flat, directed)
+        elapsed = time.perf_counter() - started
+        kind = "directed" if directed else "undirected"
+        print(f"{kind} graph: {vertices} vertices, {edges} edges")
+        name = "from_edges (numpy)" if numpy is not None else "from_edges (stdlib)"
+        rate = edges / elapsed
+        verdict = "meets" if rate >= LOAD_TARGET else "MISSES"
+        print(f"  {name:<30} {elapsed:8.2f}s  {rate:12.0f} edges/s  {verdict} the {LOAD_TARGET} edges/s target")
+        if numpy is None and rate < LOAD_TARGET:
+            print("  (the stdlib fallback is not meant for bulk loads; install NumPy)")
+        if directed:
+            # keep only forward edges so the graph is acyclic for topological_sort
+            dag = array("i", chain.from_iterable((u, v) if u < v else (v, u)
+                                                 for u, v in zip(flat[0::2], flat[1::2]) if u != v))
+            analyses = [("strongly_connected_components", graph),
+                        ("topological_sort", Graph.from_edges(vertices, dag, directed=True))]
+        else:
+            analyses = [("connected_components", graph), ("bridges", graph),
+                        ("articulation_points", graph)]
+        for name, target in analyses:
+            started = time.perf_counter()
+            getattr(target, name)()
+            elapsed = time.perf_counter() - started
+            print(f"  {name:<30} {elapsed:8.2f}s  {edges / elapsed:12.0f} edges/s")
+
+
 if __name__ == "__main__":
-    vertices = int(input("Enter the number of vertices: "))
-    graph = Graph(vertices)
+    if sys.argv[1:] == ["--benchmark"]:
+        benchmark()
+    else:
+        vertices = int(input("Enter the number of vertices: "))
+        graph = Graph(vertices)
 
-    edges_count = int(input("Enter the number of edges: "))
-    print("Enter the edges (u v):")
+        edges_count = int(input("Enter the number of edges: "))
+        print("Enter the edges (u v):")
 
-    for _ in range(edges_count):
-        u, v = map(int, input().split())
-        graph.add_edge(u, v)
+        for _ in range(edges_count):
+            u, v = map(int, input().split())
+            graph.add_edge(u, v)
 
-    graph.show_graph()
+        graph.show_graph()
 
-    start_node = int(input("\nEnter the start node for DFS: "))
-    graph.dfs(start_node)
+        start_node = int(input("\nEnter the start node for DFS: "))
+        graph.dfs(start_node)
@@ -1,3 +1,12 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+from itertools import repeat
+
+
 class Rule:
     def __init__(self, conclusion, conditions):
         self.conclusion = conclusion
@@ -8,15 +17,232 @@ class Rule:
             return f"{self.conclusion}."
         return f"{self.conclusion} :- {', '.join(self.conditions)}."
 
+class RuleList:
+    # The rules of a KnowledgeBase as Rule objects, built on demand from its flat arrays;
+    # appending a Rule stores it in the arrays.
+    def __init__(self, kb):
+        self.kb = kb
+
+    def __len__(self):
+        return len(self.kb.conclusions)
+
+    def __getitem__(self, number):
+        if isinstance(number, slice):
+            return [self[i] for i in range(*number.indices(len(self)))]
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError("rule index out of range")
+        kb = self.kb
+        conditions = kb.condition_ids[kb.condition_offsets[number]:kb.condition_offsets[number + 1]]
+        return Rule(kb.symbols[kb.conclusions[number]], [kb.symbols[condition] for condition in conditions])
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+
+    def append(self, rule):
+        self.kb.store_rule(rule.conclusion, rule.conditions)
+
+def group_rules(symbols, numbers, size):
+    # Counting sort of the rule numbers by symbol into CSR arrays: the numbers paired with
+    # symbol s end up at ids[offsets[s]:offsets[s + 1]], in their original order.
+    offsets = array("q", bytes(8 * (size + 1)))
+    for symbol in symbols:
+        offsets[symbol + 1] += 1
+    for symbol in range(size):
+        offsets[symbol + 1] += offsets[symbol]
+    ids = array("i", bytes(4 * len(numbers)))
+    fill = offsets[:-1]
+    for symbol, number in zip(symbols, numbers):
+        ids[fill[symbol]] = number
+        fill[symbol] += 1
+    return offsets, ids
+
 class KnowledgeBase:
     def __init__(self):
         self.facts = set()
-        self.rules = []
+        # Symbols are interned to ids; rule i concludes conclusions[i] from the conditions
+        # condition_ids[condition_offsets[i]:condition_offsets[i + 1]].
+        self.symbols = []
+        self.symbol_ids = {}
+        self.conclusions = array("i")
+        self.condition_offsets = array("q", [0])
+        self.condition_ids = array("i")
+        self.rules = RuleList(self)
+        # The numbers of the rules using symbol s as a condition are
+        # condition_rule_ids[condition_rule_offsets[s]:condition_rule_offsets[s + 1]], and
+        # likewise for the rules concluding it; with the number of distinct conditions of
+        # each rule. Rules appended to self.rules are indexed on the next chaining run.
+        self.condition_rule_offsets = array("q", [0])
+        self.condition_rule_ids = array("i")
+        self.conclusion_rule_offsets = array("q", [0])
+        self.conclusion_rule_ids = array("i")
+        self.condition_counts = array("i")
+        self.unconditional = []
+        # Materialized closure of the facts under the rules, one flag per symbol id, with
+        # the number of distinct conditions of each rule that are not in it; None until
+        # materialize is called.
+        self.closure = None
+        self.remaining = None
+
+    def intern(self, name):
+        symbol = self.symbol_ids.get(name)
+        if symbol is None:
+            symbol = self.symbol_ids[name] = len(self.symbols)
+            self.symbols.append(name)
+        return symbol
 
     def add_fact(self, fact_name):
         cleaned_fact = fact_name.strip()
         if cleaned_fact:
             self.facts.add(cleaned_fact)
+            if self.closure is not None:
+                fact = self.intern(cleaned_fact)
+                self.materialize()
+                self.propagate([fact])
+
+    def assert_fact(self, fact_name):
+        self.materialize()
+        self.add_fact(fact_name)
+
+    def retract_fact(self, fact_name):
+        # DRed: delete everything with a derivation through the fact, then rederive the
+        # deleted facts that are still given or concluded by a rule that fully holds.
+        cleaned_fact = fact_name.strip()
+        if cleaned_fact not in self.facts:
+            return
+        self.facts.discard(cleaned_fact)
+        if self.closure is None:
+            return
+        closure = self.materialize()
+        remaining = self.remaining
+        fact = self.symbol_ids[cleaned_fact]
+        if not closure[fact]:
+            return
+        closure[fact] = 0
+        deleted = [fact]
+        stack = [fact]
+        rule_offsets, rule_ids = self.condition_rule_offsets, self.condition_rule_ids
+        while stack:
+            fact = stack.pop()
+            for number in rule_ids[rule_offsets[fact]:rule_offsets[fact + 1]]:
+                remaining[number] += 1
+                if remaining[number] == 1:
+                    conclusion = self.conclusions[number]
+                    if closure[conclusion]:
+                        closure[conclusion] = 0
+                        deleted.append(conclusion)
+                        stack.append(conclusion)
+
+        rule_offsets, rule_ids = self.conclusion_rule_offsets, self.conclusion_rule_ids
+        self.propagate([
+            fact for fact in deleted
+            if self.symbols[fact] in self.facts
+            or any(not remaining[number] for number in rule_ids[rule_offsets[fact]:rule_offsets[fact + 1]])
+        ])
+
+    def materialize(self):
+        # builds the closure, or brings it up to date with rules and symbols added since
+        if self.closure is None:
+            self.closure = bytearray()
+            self.remaining = array("i")
+            fired = [self.intern(fact) for fact in self.facts]
+        else:
+            fired = []
+        self.index_rules()
+        closure, offsets, ids = self.closure, self.condition_offsets, self.condition_ids
+        closure.extend(bytes(len(self.symbols) - len(closure)))
+        for number in range(len(self.remaining), len(self.conclusions)):
+            count = sum(1 for condition in set(ids[offsets[number]:offsets[number + 1]]) if not closure[condition])
+            self.remaining.append(count)
+            if not count:
+                fired.append(self.conclusions[number])
+        self.propagate(fired)
+        return closure
+
+    def propagate(self, facts):
+        closure, remaining, conclusions = self.closure, self.remaining, self.conclusions
+        rule_offsets, rule_ids = self.condition_rule_offsets, self.condition_rule_ids
+        agenda = []
+        for fact in facts:
+            if not closure[fact]:
+                closure[fact] = 1
+                agenda.append(fact)
+        while agenda:
+            fact = agenda.pop()
+            for number in rule_ids[rule_offsets[fact]:rule_offsets[fact + 1]]:
+                remaining[number] -= 1
+                if not remaining[number]:
+                    conclusion = conclusions[number]
+                    if not closure[conclusion]:
+                        closure[conclusion] = 1
+                        agenda.append(conclusion)
+
+    def store_rule(self, conclusion, conditions):
+        intern = self.intern
+        self.conclusions.append(intern(conclusion))
+        self.condition_ids.extend([intern(condition) for condition in conditions])
+        self.condition_offsets.append(len(self.condition_ids))
+
+    def add_rule(self, conclusion, conditions):
+        self.store_rule(conclusion, conditions)
+        return Rule(conclusion, conditions)
+
+    def load_rules(self, path):
+        # Streams rules written the way Rule prints them, "d :- a, b." or "d.", any number
+        # to a line and free to span lines; a % starts a comment. Returns how many were read.
+        count = 0
+        pending = ""
+        with open(path) as f:
+            for line in f:
+                *clauses, pending = (pending + line.split("%", 1)[0]).split(".")
+                for clause in clauses:
+                    head, separator, body = clause.partition(":-")
+                    conclusion = head.strip()
+                    conditions = [condition.strip() for condition in body.split(",")] if separator else []
+                    if not conclusion or not all(conditions):
+                        if not clause.strip():
+                            continue
+                        raise ValueError(f"Malformed rule in {path}: {clause.strip()}.")
+                    self.store_rule(conclusion, conditions)
+                    count += 1
+        if pending.strip():
+            raise ValueError(f"Unterminated rule at the end of {path}: {pending.strip()}")
+        return count
+
+    def index_rules(self):
+        # Counts the distinct conditions of the rules appended since the last call and
+        # rebuilds both rule indexes over every rule, so appending in bulk between chaining
+        # runs pays for one rebuild. Symbols interned since only get empty entries.
+        offsets, ids, counts = self.condition_offsets, self.condition_ids, self.condition_counts
+        indexed, rule_count = len(counts), len(self.conclusions)
+        size = len(self.symbols)
+        if indexed == rule_count:
+            for rule_offsets in (self.condition_rule_offsets, self.conclusion_rule_offsets):
+                rule_offsets.extend(array("q", [rule_offsets[-1]]) * (size + 1 - len(rule_offsets)))
+            return
+        for number in range(indexed, rule_count):
+            count = len(set(ids[offsets[number]:offsets[number + 1]]))
+            counts.append(count)
+            if not count:
+                self.unconditional.append(number)
+
+        # each distinct condition of each rule, next to the number of the rule it belongs to
+        if sum(counts) == len(ids):
+            conditions = ids
+        else:
+            conditions = array("i")
+            for number in range(rule_count):
+                start, end = offsets[number], offsets[number + 1]
+                row = ids[start:end]
+                conditions.extend(row if counts[number] == end - start else dict.fromkeys(row))
+        owners = array("i")
+        for number, count in enumerate(counts):
+            owners.extend(repeat(number, count))
+        self.condition_rule_offsets, self.condition_rule_ids = group_rules(conditions, owners, size)
+        self.conclusion_rule_offsets, self.conclusion_rule_ids = group_rules(
+            self.conclusions, array("i", range(rule_count)), size)
 
     def get_initial_facts_from_user(self):
         facts_str = input("Enter initial facts (comma-separated, e.g., a,b): ").strip()
@@ -53,8 +279,7 @@ class KnowledgeBase:
             if conditions_str:
                 conditions = [cond.strip() for cond in conditions_str.split(',') if cond.strip()]
 
-            rule = Rule(conclusion, conditions)
-            self.rules.append(rule)
+            rule = self.add_rule(conclusion, conditions)
             print(f"  Rule added: {str(rule)}")
 
 
@@ -66,28 +291,52 @@ class KnowledgeBase:
                 print("Goal cannot be empty. Please try again.")
         return goal
 
-    def forward_chain(self, goal):
-        inferred_facts = set(self.facts)
+    def query(self, goal):
+        closure = self.materialize()
+        goal = self.symbol_ids.get(goal)
+        return goal is not None and closure[goal] == 1
 
-        while True:
-            newly_inferred_this_iteration = set()
-            for rule in self.rules:
-                if rule.conclusion not in inferred_facts:
-                    all_conditions_met = True
-                    for condition in rule.conditions:
-                        if condition not in inferred_facts:
-                            all_conditions_met = False
-                            break
-
-                    if all_conditions_met:
-                        newly_inferred_this_iteration.add(rule.conclusion)
-
-            if not newly_inferred_this_iteration:
-                break
+    def query_many(self, goals):
+        closure = self.materialize()
+        symbol_ids = self.symbol_ids
+        return {goal: goal in symbol_ids and closure[symbol_ids[goal]] == 1 for goal in goals}
 
-            inferred_facts.update(newly_inferred_this_iteration)
+    def forward_chain(self, goal):
+        # Each fact is taken off the agenda once and counts down the rules that use it;
+        # a rule whose count reaches zero fires. Stops as soon as goal is inferred.
+        if goal in self.facts:
+            return True
+        goal = self.symbol_ids.get(goal)
+        if goal is None:
+            return False
+        agenda = [self.intern(fact) for fact in self.facts]
+        self.index_rules()
+        inferred_facts = bytearray(len(self.symbols))
+        for fact in agenda:
+            inferred_facts[fact] = 1
+        for number in self.unconditional:
+            conclusion = self.conclusions[number]
+            if not inferred_facts[conclusion]:
+                if conclusion == goal:
+                    return True
+                inferred_facts[conclusion] = 1
+                agenda.append(conclusion)
 
-        return goal in inferred_facts
+        remaining = array("i", self.condition_counts)
+        rule_offsets, rule_ids = self.condition_rule_offsets, self.condition_rule_ids
+        while agenda:
+            fact = agenda.pop()
+            for number in rule_ids[rule_offsets[fact]:rule_offsets[fact + 1]]:
+                remaining[number] -= 1
+                if not remaining[number]:
+                    conclusion = self.conclusions[number]
+                    if not inferred_facts[conclusion]:
+                        if conclusion == goal:
+                            return True
+                        inferred_facts[conclusion] = 1
+                        agenda.append(conclusion)
+
+        return False
 
 def main():
     kb = KnowledgeBase()
@@ -117,5 +366,59 @@ def main():
     else:
         print(f"The goal '{goal}' cannot be achieved.")
 
+def benchmark(num_rules=100000, seed=0):
+    # a derivation chain through every rule, plus random rules with one to three conditions
+    rng = random.Random(seed)
+    kb = KnowledgeBase()
+    kb.add_fact("f0")
+    for i in range(num_rules // 2):
+        kb.add_rule(f"f{i + 1}", [f"f{i}"])
+    for _ in range(num_rules - num_rules // 2):
+        kb.add_rule(f"f{rng.randrange(num_rules)}", [f"f{rng.randrange(num_rules)}" for _ in range(rng.randint(1, 3))])
+    kb.add_rule("missing", ["never"])
+
+    handle, path = tempfile.mkstemp(suffix=".pl")
+    try:
+        with os.fdopen(handle, "w") as f:
+            f.writelines(f"{rule}\n" for rule in kb.rules)
+        kb = KnowledgeBase()
+        kb.add_fact("f0")
+        start = time.perf_counter()
+        kb.load_rules(path)
+        print(f"Loaded {len(kb.rules)} rules ({os.path.getsize(path)} bytes) in {time.perf_counter() - start:.3f}s")
+    finally:
+        os.remove(path)
+
+    start = time.perf_counter()
+    kb.index_rules()
+    print(f"Indexed {len(kb.rules)} rules in {time.perf_counter() - start:.3f}s")
+    for goal in (f"f{num_rules // 4}", f"f{num_rules // 2}", "missing"):
+        start = time.perf_counter()
+        result = kb.forward_chain(goal)
+        print(f"forward_chain({goal!r}) = {result} in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    kb.materialize()
+    print(f"Materialized {kb.closure.count(1)} facts in {(time.perf_counter() - start) * 1000:.1f}ms")
+    goals = [f"f{rng.randrange(2 * num_rules)}" for _ in range(100000)]
+    start = time.perf_counter()
+    answers = kb.query_many(goals)
+    print(f"query_many answered {len(goals)} goals ({sum(answers.values())} true) "
+          f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+    for fact in ("extra", "f0"):
+        start = time.perf_counter()
+        if fact in kb.facts:
+            kb.retract_fact(fact)
+            size = kb.closure.count(1)
+            kb.assert_fact(fact)
+        else:
+            kb.assert_fact(fact)
+            size = kb.closure.count(1)
+            kb.retract_fact(fact)
+        print(f"Toggled {fact!r} (closure {size} facts in between) in {(time.perf_counter() - start) * 1000:.1f}ms")
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--benchmark"]:
+        benchmark()
+    else:
+        main()
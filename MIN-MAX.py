@@ -1,20 +1,121 @@
 import math
+import mmap
+import multiprocessing
+import os
 import random
 import copy
-from typing import List, Optional, Dict, Union
+import sys
+import time
+from array import array
+from functools import lru_cache
+from typing import Callable, List, Optional, Dict, Tuple, Union
+
+# center first, then corners, then edges
+MOVE_ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+FULL_BOARD = 0x1FF
+WIN_MASKS = [
+    sum(1 << square for square in line)
+    for line in ([0, 1, 2], [3, 4, 5], [6, 7, 8], [0, 3, 6], [1, 4, 7], [2, 5, 8], [0, 4, 8], [2, 4, 6])
+]
+SQUARE_WIN_MASKS = [[mask for mask in WIN_MASKS if mask >> square & 1] for square in range(9)]
+
+
+def symmetries() -> List[List[int]]:
+    # the square each square goes to under the 4 rotations, with and without a mirror
+    rotate = [(square % 3) * 3 + 2 - square // 3 for square in range(9)]
+    mirror = [square // 3 * 3 + 2 - square % 3 for square in range(9)]
+    result, current = [], list(range(9))
+    for _ in range(4):
+        result += [current, [mirror[square] for square in current]]
+        current = [rotate[square] for square in current]
+    return result
+
+
+# SYMMETRY_TABLES[s][bits] is the 9-bit board bits after symmetry s
+SYMMETRY_TABLES = [
+    array('H', (sum(1 << target for square, target in enumerate(perm) if bits >> square & 1) for bits in range(512)))
+    for perm in symmetries()
+]
+# TERNARY_TABLES[s][bits] is the base-3 value of the squares in bits after symmetry s
+TERNARY_TABLES = [
+    array('H', (sum(3 ** target for square, target in enumerate(perm) if bits >> square & 1) for bits in range(512)))
+    for perm in symmetries()
+]
+# INVERSE_SYMMETRIES[s][target] is the square symmetry s moves to target
+INVERSE_SYMMETRIES = [[perm.index(target) for target in range(9)] for perm in symmetries()]
+EXACT, LOWER, UPPER = 0, 1, 2
+# above any heuristic evaluation; a win scores WIN_SCORE plus the squares left empty
+WIN_SCORE = 1 << 40
+
+
+@lru_cache(maxsize=None)
+def board_geometry(size: int, k: int) -> Tuple[List[List[int]], List[List[int]], List[int], List[List[int]], List[int]]:
+    # every line of k squares, the lines through each square, the squares nearest the
+    # center first (corners before edges at equal distance), the neighbors of each
+    # square, and the evaluation weight of a line holding n stones of one letter only
+    windows = []
+    for row in range(size):
+        for col in range(size):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                if 0 <= row + dr * (k - 1) < size and 0 <= col + dc * (k - 1) < size:
+                    windows.append([(row + dr * i) * size + col + dc * i for i in range(k)])
+    square_windows = [[] for _ in range(size * size)]
+    for index, window in enumerate(windows):
+        for square in window:
+            square_windows[square].append(index)
+    center = (size - 1) / 2
+    move_order = sorted(range(size * size), key=lambda square: (
+        max(abs(square // size - center), abs(square % size - center)),
+        -abs(square // size - center) - abs(square % size - center)))
+    neighbors = [
+        [r * size + c for r in range(row - 1, row + 2) for c in range(col - 1, col + 2)
+         if 0 <= r < size and 0 <= c < size and (r, c) != (row, col)]
+        for row in range(size) for col in range(size)
+    ]
+    return windows, square_windows, move_order, neighbors, [0] + [10 ** n for n in range(k)]
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int) -> Dict[str, List[int]]:
+    rng = random.Random(size)
+    return {letter: [rng.getrandbits(64) for _ in range(size * size)] for letter in 'XO'}
+
+
+ZOBRIST_SIDE = random.Random(0).getrandbits(64)
 
 
 class TicTacToe:
-    def __init__(self) -> None:
-        self.board: List[str] = [' ' for _ in range(9)]
+    def __init__(self, size: int = 3, k: int = 3) -> None:
+        self.size = size
+        self.k = k
+        self.board: List[str] = [' ' for _ in range(size * size)]
         self.current_winner: Optional[str] = None
+        self.windows, self.square_windows, self.move_order, self.neighbors, self.weights = board_geometry(size, k)
+        self.zobrist = zobrist_keys(size)
+        # kept up to date by make_move and undo_move: the Zobrist key of the stones, how many
+        # stones of each letter each line holds, the heuristic value of the position for X
+        # and how many stones touch each square
+        self.key = 0
+        self.counts = {letter: [0] * len(self.windows) for letter in 'XO'}
+        self.evaluation = 0
+        self.adjacent = [0] * (size * size)
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> 'TicTacToe':
+        # the geometry and Zobrist tables are shared, only the position is copied
+        game = copy.copy(self)
+        game.board = self.board[:]
+        game.counts = {letter: counts[:] for letter, counts in self.counts.items()}
+        game.adjacent = self.adjacent[:]
+        return game
 
     def print_board(self) -> None:
         print("\nBoard:")
-        for i in range(3):
-            row = self.board[i * 3:(i + 1) * 3]
-            display = [str(i * 3 + j + 1) if val == ' ' else val for j, val in enumerate(row)]
-            print('| ' + ' | '.join(display) + ' |')
+        width = len(str(self.size * self.size))
+        for i in range(self.size):
+            row = self.board[i * self.size:(i + 1) * self.size]
+            display = [str(i * self.size + j + 1) if val == ' ' else val for j, val in enumerate(row)]
+            print('| ' + ' | '.join(cell.rjust(width) for cell in display) + ' |')
 
     def available_moves(self) -> List[int]:
         return [i for i, spot in enumerate(self.board) if spot == ' ']
@@ -28,26 +129,162 @@ class TicTacToe:
     def make_move(self, square: int, letter: str) -> bool:
         if self.board[square] == ' ':
             self.board[square] = letter
+            self.key ^= self.zobrist[letter][square]
+            self.update_lines(square, letter, 1)
+            for neighbor in self.neighbors[square]:
+                self.adjacent[neighbor] += 1
             if self.winner(square, letter):
                 self.current_winner = letter
             return True
         return False
 
+    def undo_move(self, square: int) -> None:
+        letter = self.board[square]
+        if letter == ' ':
+            return
+        self.board[square] = ' '
+        self.key ^= self.zobrist[letter][square]
+        self.update_lines(square, letter, -1)
+        for neighbor in self.neighbors[square]:
+            self.adjacent[neighbor] -= 1
+        self.current_winner = None
+
+    def update_lines(self, square: int, letter: str, delta: int) -> None:
+        # a line is worth weights[n] to the only letter with stones in it, nothing if both have
+        x, o, weights = self.counts['X'], self.counts['O'], self.weights
+        counts = x if letter == 'X' else o
+        for w in self.square_windows[square]:
+            before = (0 if o[w] else weights[x[w]]) - (0 if x[w] else weights[o[w]])
+            counts[w] += delta
+            self.evaluation += (0 if o[w] else weights[x[w]]) - (0 if x[w] else weights[o[w]]) - before
+
     def winner(self, square: int, letter: str) -> bool:
-        row_ind = square // 3
-        row = self.board[row_ind * 3:(row_ind + 1) * 3]
-        if all([s == letter for s in row]):
-            return True
-        col_ind = square % 3
-        column = [self.board[col_ind + i * 3] for i in range(3)]
-        if all([s == letter for s in column]):
-            return True
-        if square % 2 == 0:
-            diag1 = [self.board[i] for i in [0, 4, 8]]
-            diag2 = [self.board[i] for i in [2, 4, 6]]
-            if all([s == letter for s in diag1]) or all([s == letter for s in diag2]):
-                return True
-        return False
+        counts = self.counts[letter]
+        return any(counts[w] == self.k for w in self.square_windows[square])
+
+
+class BitboardTicTacToe(TicTacToe):
+    # Same interface as TicTacToe, but the squares of each letter are the bits of one int.
+    def __init__(self) -> None:
+        self.size = 3
+        self.k = 3
+        self.move_order = MOVE_ORDER
+        self.x = 0
+        self.o = 0
+        self.current_winner: Optional[str] = None
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> 'BitboardTicTacToe':
+        return copy.copy(self)
+
+    @property
+    def board(self) -> List[str]:
+        return ['X' if self.x >> i & 1 else 'O' if self.o >> i & 1 else ' ' for i in range(9)]
+
+    def available_moves(self) -> List[int]:
+        occupied = self.x | self.o
+        return [i for i in range(9) if not occupied >> i & 1]
+
+    def empty_squares(self) -> bool:
+        return self.x | self.o != FULL_BOARD
+
+    def num_empty_squares(self) -> int:
+        return 9 - (self.x | self.o).bit_count()
+
+    def make_move(self, square: int, letter: str) -> bool:
+        bit = 1 << square
+        if (self.x | self.o) & bit:
+            return False
+        if letter == 'X':
+            self.x |= bit
+        else:
+            self.o |= bit
+        if self.winner(square, letter):
+            self.current_winner = letter
+        return True
+
+    def undo_move(self, square: int) -> None:
+        self.x &= ~(1 << square)
+        self.o &= ~(1 << square)
+        self.current_winner = None
+
+    def winner(self, square: int, letter: str) -> bool:
+        bits = self.x if letter == 'X' else self.o
+        return any(bits & mask == mask for mask in SQUARE_WIN_MASKS[square])
+
+    def canonical_key(self) -> int:
+        # smallest encoding over the 8 symmetries, with the side to move in the low bit
+        key = min(table[self.x] << 9 | table[self.o] for table in SYMMETRY_TABLES)
+        return key << 1 | (self.x.bit_count() != self.o.bit_count())
+
+
+def canonical_index(x: int, o: int) -> Tuple[int, int]:
+    # base-3 index (empty 0, X 1, O 2) of the smallest orientation, and the symmetry giving it
+    return min((table[x] + 2 * table[o], symmetry) for symmetry, table in enumerate(TERNARY_TABLES))
+
+
+class OpeningBook:
+    # The best move and its score for the side to move in every reachable 3x3 position,
+    # two signed bytes at twice the canonical index; the move is -1 where nothing was solved.
+    MAGIC = b'TTB1'
+
+    def __init__(self, entries: Union[array, memoryview]) -> None:
+        self.entries = entries
+
+    @classmethod
+    def build(cls) -> 'OpeningBook':
+        entries = array('b', [-1, 0]) * 3 ** 9
+        perms = symmetries()
+        game = BitboardTicTacToe()
+
+        def solve(player: str) -> int:
+            index, symmetry = canonical_index(game.x, game.o)
+            if entries[2 * index] >= 0:
+                return entries[2 * index + 1]
+            best, best_move = -math.inf, -1
+            other_player = 'O' if player == 'X' else 'X'
+            for move in MOVE_ORDER:
+                if game.make_move(move, player):
+                    if game.current_winner is not None:
+                        score = game.num_empty_squares() + 1
+                    elif not game.empty_squares():
+                        score = 0
+                    else:
+                        score = -solve(other_player)
+                    game.undo_move(move)
+                    if score > best:
+                        best, best_move = score, move
+            entries[2 * index] = perms[symmetry][best_move]
+            entries[2 * index + 1] = best
+            return best
+
+        solve('X')
+        return cls(entries)
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(self.entries)
+
+    @classmethod
+    def load(cls, path: str) -> 'OpeningBook':
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:4] != cls.MAGIC or len(buffer) != 4 + 2 * 3 ** 9:
+            raise ValueError(f"{path} is not an opening book.")
+        return cls(memoryview(buffer)[4:].cast('b'))
+
+    def lookup(self, game: TicTacToe) -> Optional[Tuple[int, int]]:
+        # (best move, score for the side to move), or None for unreachable positions
+        if isinstance(game, BitboardTicTacToe):
+            x, o = game.x, game.o
+        else:
+            x = sum(1 << i for i, val in enumerate(game.board) if val == 'X')
+            o = sum(1 << i for i, val in enumerate(game.board) if val == 'O')
+        index, symmetry = canonical_index(x, o)
+        move = self.entries[2 * index]
+        if move < 0:
+            return None
+        return INVERSE_SYMMETRIES[symmetry][move], self.entries[2 * index + 1]
 
 
 class Player:
@@ -62,7 +299,7 @@ class HumanPlayer(Player):
     def get_move(self, game: TicTacToe) -> int:
         val = None
         while val is None:
-            move = input(f"{self.letter}'s move (1-9): ")
+            move = input(f"{self.letter}'s move (1-{len(game.board)}): ")
             try:
                 square = int(move) - 1
                 if square not in game.available_moves():
@@ -73,15 +310,50 @@ class HumanPlayer(Player):
         return val
 
 
+class RandomPlayer(Player):
+    def get_move(self, game: TicTacToe) -> int:
+        return random.choice(game.available_moves())
+
+
 class AIPlayer(Player):
-    def __init__(self, letter: str) -> None:
+    def __init__(self, letter: str, time_limit: float = 1.0, cache_bits: int = 16,
+                 book: Optional[OpeningBook] = None) -> None:
         super().__init__(letter)
+        # 3x3 moves come straight from the book when one is given
+        self.book = book
         self.memo: Dict[str, Dict[str, Union[int, Optional[int]]]] = {}
+        self.nodes = 0
+        # canonical bitboard key -> (EXACT / LOWER / UPPER, negamax score)
+        self.table: Dict[int, Tuple[int, int]] = {}
+        # Boards larger than 3x3 are searched by iterative deepening for time_limit seconds.
+        # Its transposition table has 2 ** cache_bits slots of (key, depth, flag, score,
+        # move, search number), allocated on first use and never grown.
+        self.time_limit = time_limit
+        self.cache_bits = cache_bits
+        self.cache: Optional[List[Optional[Tuple[int, int, int, int, int, int]]]] = None
+        self.searches = 0
+        self.depth_reached = 0
+        self.deadline = math.inf
+        self.timed_out = False
+        # set when a search skipped some empty squares, so its result is not a proof
+        self.pruned = False
+        self.best_move: Optional[int] = None
 
     def get_move(self, game: TicTacToe) -> int:
-        if len(game.available_moves()) == 9:
-            return random.choice(game.available_moves())
-        result = self.minimax(game, self.letter)
+        if len(game.available_moves()) == len(game.board):
+            if game.size == 3:
+                return random.choice(game.available_moves())
+            return game.move_order[0]
+        if self.book is not None and game.size == 3 and game.k == 3:
+            entry = self.book.lookup(game)
+            if entry is not None:
+                return entry[0]
+        if isinstance(game, BitboardTicTacToe):
+            result = self.bitboard_search(game, self.letter)
+        elif game.size == 3 and game.k == 3:
+            result = self.alphabeta(game, self.letter)
+        else:
+            result = self.iterative_deepening(game, self.letter)
         move = result['position']
         return move if move is not None else random.choice(game.available_moves())
 
@@ -89,6 +361,7 @@ class AIPlayer(Player):
         return ''.join(board)
 
     def minimax(self, game: TicTacToe, player: str) -> Dict[str, Union[int, Optional[int]]]:
+        self.nodes += 1
         key = self.board_to_key(game.board)
         if key in self.memo:
             return self.memo[key]
@@ -127,6 +400,206 @@ class AIPlayer(Player):
         self.memo[key] = best
         return best
 
+    def alphabeta(self, game: TicTacToe, player: str, alpha: float = -math.inf,
+                  beta: float = math.inf) -> Dict[str, Union[int, Optional[int]]]:
+        # Same scores as minimax, but moves are made and undone on game itself and
+        # searched in MOVE_ORDER so the strong ones cut off the rest early.
+        self.nodes += 1
+        max_player = self.letter
+        other_player = 'O' if player == 'X' else 'X'
+
+        if game.current_winner == other_player:
+            return {
+                'position': None,
+                'score': 1 * (game.num_empty_squares() + 1) if other_player == max_player else -1 * (game.num_empty_squares() + 1)
+            }
+
+        if not game.empty_squares():
+            return {'position': None, 'score': 0}
+
+        if player == max_player:
+            best = {'position': None, 'score': -math.inf}
+        else:
+            best = {'position': None, 'score': math.inf}
+
+        for move in game.move_order:
+            if game.board[move] != ' ':
+                continue
+            game.make_move(move, player)
+            score = self.alphabeta(game, other_player, alpha, beta)['score']
+            game.undo_move(move)
+
+            if player == max_player:
+                if score > best['score']:
+                    best = {'position': move, 'score': score}
+                alpha = max(alpha, score)
+            else:
+                if score < best['score']:
+                    best = {'position': move, 'score': score}
+                beta = min(beta, score)
+            if alpha >= beta:
+                break
+
+        return best
+
+    def bitboard_search(self, game: BitboardTicTacToe, player: str) -> Dict[str, Union[int, Optional[int]]]:
+        best = {'position': None, 'score': -math.inf}
+        other_player = 'O' if player == 'X' else 'X'
+        for move in MOVE_ORDER:
+            if game.make_move(move, player):
+                score = -self.negamax(game, other_player, -math.inf, -best['score'])
+                game.undo_move(move)
+                if score > best['score']:
+                    best = {'position': move, 'score': score}
+        # scores are for the side to move; minimax reports them for this player
+        if best['position'] is not None and player != self.letter:
+            best['score'] = -best['score']
+        return best
+
+    def negamax(self, game: BitboardTicTacToe, player: str, alpha: float, beta: float) -> int:
+        self.nodes += 1
+        if game.current_winner is not None:
+            return -(game.num_empty_squares() + 1)
+        if not game.empty_squares():
+            return 0
+
+        key = game.canonical_key()
+        entry = self.table.get(key)
+        if entry is not None:
+            flag, score = entry
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+        original_alpha = alpha
+        best = -math.inf
+        other_player = 'O' if player == 'X' else 'X'
+        for move in MOVE_ORDER:
+            if game.make_move(move, player):
+                score = -self.negamax(game, other_player, -beta, -alpha)
+                game.undo_move(move)
+                best = max(best, score)
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    break
+
+        if best <= original_alpha:
+            self.table[key] = (UPPER, best)
+        elif best >= beta:
+            self.table[key] = (LOWER, best)
+        else:
+            self.table[key] = (EXACT, best)
+        return best
+
+    def iterative_deepening(self, game: TicTacToe, player: str,
+                            max_depth: Optional[int] = None) -> Dict[str, Union[int, Optional[int]]]:
+        # Depth-limited searches of growing depth until time_limit runs out (the first
+        # one always finishes) or the game is decided by a search that tried every empty
+        # square; each reuses the cache of the last.
+        if self.cache is None:
+            self.cache = [None] * (1 << self.cache_bits)
+        self.searches += 1
+        self.deadline = math.inf
+        self.timed_out = False
+        start = time.perf_counter()
+        best = {'position': None, 'score': 0}
+        for depth in range(1, min(max_depth or math.inf, game.num_empty_squares()) + 1):
+            self.best_move = None
+            self.pruned = False
+            score = self.depth_search(game, player, depth, -math.inf, math.inf, 0)
+            if self.timed_out:
+                break
+            best = {'position': self.best_move, 'score': score if player == self.letter else -score}
+            self.depth_reached = depth
+            self.deadline = start + self.time_limit
+            if (abs(score) >= WIN_SCORE and not self.pruned) or time.perf_counter() >= self.deadline:
+                break
+        return best
+
+    def candidate_moves(self, game: TicTacToe, player: str, everything: bool = False) -> List[int]:
+        # empty squares next to a stone (all of them if there are none, or if everything
+        # is set), best first: those on the most promising lines for either side
+        moves = [] if everything else [square for square in range(len(game.board))
+                                       if game.adjacent[square] and game.board[square] == ' ']
+        if not moves:
+            moves = game.available_moves()
+        x, o, weights = game.counts['X'], game.counts['O'], game.weights
+
+        def promise(square: int) -> int:
+            return sum((0 if o[w] else weights[x[w]]) + (0 if x[w] else weights[o[w]]) for w in game.square_windows[square])
+
+        moves.sort(key=promise, reverse=True)
+        return moves
+
+    def depth_search(self, game: TicTacToe, player: str, depth: int, alpha: float, beta: float, ply: int) -> float:
+        # negamax to the given depth, scored for player; game.evaluation at the horizon
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            self.timed_out = True
+        if self.timed_out:
+            return 0
+        if game.current_winner is not None:
+            return -(WIN_SCORE + game.num_empty_squares())
+        if not game.empty_squares():
+            return 0
+        if depth == 0:
+            return game.evaluation if player == 'X' else -game.evaluation
+
+        # a search that reaches the end of the game tries every empty square, so its
+        # result is exact; shallower ones only try the squares next to a stone
+        empty = game.num_empty_squares()
+        key = game.key ^ ZOBRIST_SIDE if player == 'O' else game.key
+        slot = key & ((1 << self.cache_bits) - 1)
+        entry = self.cache[slot]
+        hint = None
+        if entry is not None and entry[0] == key:
+            _, entry_depth, flag, score, hint, _ = entry
+            if ply and entry_depth >= depth:
+                if entry_depth < empty:
+                    self.pruned = True
+                if flag == EXACT:
+                    return score
+                if flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        moves = self.candidate_moves(game, player, everything=depth >= empty)
+        if len(moves) < empty:
+            self.pruned = True
+        if hint is not None and hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+        original_alpha = alpha
+        best, best_move = -math.inf, moves[0]
+        other_player = 'O' if player == 'X' else 'X'
+        for move in moves:
+            game.make_move(move, player)
+            score = -self.depth_search(game, other_player, depth - 1, -beta, -alpha, ply + 1)
+            game.undo_move(move)
+            if self.timed_out:
+                return 0
+            if score > best:
+                best, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        if not ply:
+            self.best_move = best_move
+
+        # keep the deeper result, but always replace entries left by earlier searches
+        if entry is None or entry[0] == key or entry[1] <= depth or entry[5] != self.searches:
+            flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+            self.cache[slot] = (key, depth, flag, best, best_move, self.searches)
+        return best
+
 
 def play(game: TicTacToe, x_player: Player, o_player: Player, print_game: bool = True) -> Optional[str]:
     if print_game:
@@ -149,15 +622,115 @@ def play(game: TicTacToe, x_player: Player, o_player: Player, print_game: bool =
     return None
 
 
+def play_games(task: Tuple[Callable[[str], Player], Callable[[str], Player], int, int, int, int, int]
+               ) -> Tuple[List[int], array, array]:
+    # Plays games start..stop-1 without printing; first is X in even games, O in odd ones.
+    # Every game reseeds random from (seed, game), so results do not depend on scheduling.
+    first, second, start, stop, seed, size, k = task
+    outcomes = [0, 0, 0]
+    latencies = (array('d'), array('d'))
+    for index in range(start, stop):
+        random.seed(seed << 32 | index)
+        players = (first('X'), second('O')) if index % 2 == 0 else (second('X'), first('O'))
+        game = TicTacToe(size, k)
+        letter = 'X'
+        while game.empty_squares():
+            turn = 0 if letter == 'X' else 1
+            began = time.perf_counter()
+            square = players[turn].get_move(game)
+            latencies[turn ^ index % 2].append(time.perf_counter() - began)
+            if game.make_move(square, letter):
+                if game.current_winner:
+                    break
+                letter = 'O' if letter == 'X' else 'X'
+        if game.current_winner is None:
+            outcomes[1] += 1
+        else:
+            outcomes[0 if (game.current_winner == 'X') == (index % 2 == 0) else 2] += 1
+    return outcomes, latencies[0], latencies[1]
+
+
+def percentiles(values: array) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    return {name: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+            for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))}
+
+
+def tournament(first: Callable[[str], Player], second: Callable[[str], Player], games: int = 1000,
+               seed: int = 0, workers: Optional[int] = None, size: int = 3, k: int = 3,
+               chunksize: int = 100) -> Dict[str, object]:
+    # Plays first against second (classes or picklable factories taking the letter) across
+    # a process pool, alternating who moves first. Wins, draws and losses are from the
+    # point of view of first; latencies are seconds per get_move call.
+    workers = workers or os.cpu_count() or 1
+    tasks = [(first, second, start, min(start + chunksize, games), seed, size, k)
+             for start in range(0, games, chunksize)]
+    outcomes = [0, 0, 0]
+    latencies = (array('d'), array('d'))
+    began = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        for counts, first_latencies, second_latencies in pool.imap_unordered(play_games, tasks):
+            outcomes = [total + count for total, count in zip(outcomes, counts)]
+            latencies[0].extend(first_latencies)
+            latencies[1].extend(second_latencies)
+    elapsed = time.perf_counter() - began
+    return {
+        'games': games, 'wins': outcomes[0], 'draws': outcomes[1], 'losses': outcomes[2],
+        'seconds': elapsed, 'workers': workers,
+        'games_per_second_per_core': games / elapsed / workers if elapsed else math.inf,
+        'first_latency': percentiles(latencies[0]), 'second_latency': percentiles(latencies[1]),
+    }
+
+
+def print_tournament(result: Dict[str, object]) -> None:
+    print(f"{result['games']} games: {result['wins']} wins, {result['draws']} draws, "
+          f"{result['losses']} losses in {result['seconds']:.2f}s on {result['workers']} workers "
+          f"({result['games_per_second_per_core']:.1f} games/s per core)")
+    for side in ('first', 'second'):
+        latency = result[f'{side}_latency']
+        print(f"{side:6s} move latency: " + ", ".join(f"{name} {value * 1e6:.1f}us" for name, value in latency.items()))
+
+
+def benchmark() -> None:
+    # 15x15 five in a row, a few stones in
+    game = TicTacToe(15, 5)
+    for square, letter in ((112, 'X'), (113, 'O'), (97, 'X'), (127, 'O'), (98, 'X')):
+        game.make_move(square, letter)
+    ai = AIPlayer('O', time_limit=2.0)
+    start = time.perf_counter()
+    result = ai.iterative_deepening(game, 'O')
+    print(f"15x15/5 deepening: {ai.nodes} nodes to depth {ai.depth_reached} in "
+          f"{time.perf_counter() - start:.3f}s, move {result['position'] + 1}")
+
+    for name, game in (('minimax', TicTacToe()), ('alphabeta', TicTacToe()),
+                       ('bitboard_search', BitboardTicTacToe())):
+        ai = AIPlayer('X')
+        start = time.perf_counter()
+        result = getattr(ai, name)(game, 'X')
+        elapsed = time.perf_counter() - start
+        print(f"{name:15s}: {ai.nodes:7d} nodes, {len(ai.memo) + len(ai.table):5d} table entries "
+              f"in {elapsed:.4f}s, opening move {result['position'] + 1}, score {result['score']}")
+
+
 if __name__ == '__main__':
-    print("Welcome to Tic Tac Toe!")
-    human_letter = ''
-    while human_letter not in ['X', 'O']:
-        human_letter = input("Choose your symbol (X or O): ").upper()
-    ai_letter = 'O' if human_letter == 'X' else 'X'
-    human = HumanPlayer(human_letter)
-    ai = AIPlayer(ai_letter)
-    x_player = human if human_letter == 'X' else ai
-    o_player = ai if human_letter == 'X' else human
-    game = TicTacToe()
-    play(game, x_player, o_player)
\ No newline at end of file
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark()
+    elif sys.argv[1:2] == ['--build-book']:
+        OpeningBook.build().save(sys.argv[2])
+    elif sys.argv[1:2] == ['--tournament']:
+        print_tournament(tournament(AIPlayer, RandomPlayer, int(sys.argv[2]),
+                                    workers=int(sys.argv[3]) if len(sys.argv) > 3 else None))
+    else:
+        print("Welcome to Tic Tac Toe!")
+        human_letter = ''
+        while human_letter not in ['X', 'O']:
+            human_letter = input("Choose your symbol (X or O): ").upper()
+        ai_letter = 'O' if human_letter == 'X' else 'X'
+        human = HumanPlayer(human_letter)
+        ai = AIPlayer(ai_letter, book=OpeningBook.load(sys.argv[2]) if sys.argv[1:2] == ['--book'] else None)
+        x_player = human if human_letter == 'X' else ai
+        o_player = ai if human_letter == 'X' else human
+        game = TicTacToe()
+        play(game, x_player, o_player)
\ No newline at end of file
@@ -1,44 +1,230 @@
-from typing import List
+import multiprocessing
+import random
+import sys
+import time
+from array import array
+from functools import cached_property
+from typing import Iterator, List, NamedTuple, Sequence, Tuple
+
+
+class Enumeration(NamedTuple):
+    total: int
+    fundamental: int
+    # canonical representative (row of the queen in each column) of every
+    # fundamental solution, when requested
+    solutions: List[Tuple[int, ...]] | None
 
 
 class NQueens:
     n: int
-    solution: List[List[int]] | None
+    # row of the queen in each column
+    queens: array
+    solved: bool
 
-    def __init__(self, n: int) -> None:
+    def __init__(self, n: int, method: str = "backtracking", seed: int | None = None) -> None:
         self.n = n
-        self.solution = [[0 for _ in range(n)] for _ in range(n)]
-        if not self.solve(0):
-            self.solution = None
-        
-    def is_safe_to_move(self, row: int, col: int) -> bool:
-        for i in range(col):
-            if self.solution[row][i] == 1:
-                return False
+        self.full = (1 << n) - 1
+        # bit r of rows, bit r + c of diagonals and bit r - c + n - 1 of antidiagonals
+        # are set while a queen stands on row r, column c
+        self.rows = self.diagonals = self.antidiagonals = 0
+        self.queens = array("i", bytes(4 * n))
+        if method == "backtracking":
+            self.solved = self.solve(0)
+        elif method == "min_conflicts":
+            self.solved = self.min_conflicts(seed)
+        else:
+            raise ValueError(f"Unknown method {method!r}.")
 
-        for i, j in zip(range(row, -1, -1), range(col, -1, -1)):
-            if self.solution[i][j] == 1:
-                return False
+    @cached_property
+    def solution(self) -> List[List[int]] | None:
+        # the n x n board is only built when asked for
+        if not self.solved:
+            return None
+        solution = [[0 for _ in range(self.n)] for _ in range(self.n)]
+        for col, row in enumerate(self.queens):
+            solution[row][col] = 1
+        return solution
 
-        for i, j in zip(range(row, self.n, 1), range(col, -1, -1)):
-            if self.solution[i][j] == 1:
-                return False
-        
-        return True
+    def is_safe_to_move(self, row: int, col: int) -> bool:
+        return not (
+            self.rows >> row & 1
+            or self.diagonals >> (row + col) & 1
+            or self.antidiagonals >> (row - col + self.n - 1) & 1
+        )
+
+    def free_rows(self, col: int) -> int:
+        return self.full & ~(self.rows | self.diagonals >> col | self.antidiagonals >> (self.n - 1 - col))
 
     def solve(self, col: int) -> bool:
         if col == self.n:
             return True
 
-        for i in range(self.n):
-            if self.is_safe_to_move(i, col):
-                self.solution[i][col] = 1
-                if self.solve(col + 1):
-                    return True
-                self.solution[i][col] = 0
+        free = self.free_rows(col)
+        while free:
+            bit = free & -free
+            free ^= bit
+            diagonal, antidiagonal = bit << col, bit << (self.n - 1 - col)
+            self.rows ^= bit
+            self.diagonals ^= diagonal
+            self.antidiagonals ^= antidiagonal
+            self.queens[col] = bit.bit_length() - 1
+            if self.solve(col + 1):
+                return True
+            self.rows ^= bit
+            self.diagonals ^= diagonal
+            self.antidiagonals ^= antidiagonal
 
         return False
 
+    def min_conflicts(self, seed: int | None = None) -> bool:
+        # QS4-style local search over permutations, so rows never clash and only the
+        # diagonals need counting: queens are first placed greedily on conflict-free
+        # diagonals for about 3n random tries, then conflicted queens are swapped with
+        # random others whenever that lowers the number of attacking pairs.
+        n = self.n
+        if n in (2, 3):
+            return False
+        if n == 0:
+            return True
+        rand = random.Random(seed).random
+        shift = n - 1
+
+        while True:
+            queens = array("i", range(n))
+            diagonals = array("i", bytes(4 * (2 * n - 1)))
+            antidiagonals = array("i", bytes(4 * (2 * n - 1)))
+            tries, limit = 0, int(3.08 * n)
+            for i in range(n):
+                while tries < limit:
+                    tries += 1
+                    j = i + int(rand() * (n - i))
+                    row = queens[j]
+                    if not diagonals[row + i] and not antidiagonals[row - i + shift]:
+                        break
+                else:
+                    j = i + int(rand() * (n - i))
+                queens[i], queens[j] = queens[j], queens[i]
+                row = queens[i]
+                diagonals[row + i] += 1
+                antidiagonals[row - i + shift] += 1
+
+            def attacks(i: int) -> int:
+                row = queens[i]
+                return diagonals[row + i] + antidiagonals[row - i + shift] - 2
+
+            def pair_attacks(i: int, j: int) -> int:
+                # attacking pairs involving i or j; a pair between them is counted once
+                shared = queens[i] + i == queens[j] + j or queens[i] - i == queens[j] - j
+                return attacks(i) + attacks(j) - shared
+
+            def swap(i: int, j: int) -> None:
+                for k in (i, j):
+                    diagonals[queens[k] + k] -= 1
+                    antidiagonals[queens[k] - k + shift] -= 1
+                queens[i], queens[j] = queens[j], queens[i]
+                for k in (i, j):
+                    diagonals[queens[k] + k] += 1
+                    antidiagonals[queens[k] - k + shift] += 1
+
+            total = sum(count * (count - 1) // 2 for count in diagonals)
+            total += sum(count * (count - 1) // 2 for count in antidiagonals)
+            # any attacking pair includes a queen that was conflicted or has moved since
+            candidates = [i for i in range(n) if attacks(i)]
+            stall = 0
+            while total and stall < 100 * n:
+                moved = set()
+                for i in candidates:
+                    if not attacks(i):
+                        continue
+                    j = int(rand() * n)
+                    before = pair_attacks(i, j)
+                    swap(i, j)
+                    after = pair_attacks(i, j)
+                    if i != j and after < before:
+                        total += after - before
+                        moved.add(j)
+                        stall = 0
+                        if not total:
+                            break
+                    else:
+                        swap(i, j)
+                        stall += 1
+                candidates = [i for i in moved.union(candidates) if attacks(i)]
+            if not total:
+                self.queens = queens
+                return True
+
+    def count_solutions(self) -> int:
+        if self.n <= 1:
+            return 1
+        full = self.full
+
+        # masks are relative to the column being filled, so the diagonals just shift by one
+        def count(rows: int, left: int, right: int) -> int:
+            free = full & ~(rows | left | right)
+            if rows | free & -free == full:
+                return 1 if free else 0
+            total = 0
+            while free:
+                bit = free & -free
+                free ^= bit
+                total += count(rows | bit, (left | bit) << 1, (right | bit) >> 1)
+            return total
+
+        # a solution and its mirror image start in rows r and n - 1 - r
+        half = 0
+        for row in range(self.n // 2):
+            bit = 1 << row
+            half += count(bit, bit << 1, bit >> 1)
+        total = 2 * half
+        if self.n & 1:
+            bit = 1 << self.n // 2
+            total += count(bit, bit << 1, bit >> 1)
+        return total
+
+    def iter_solutions(self) -> Iterator[Tuple[int, ...]]:
+        # every solution in lexicographic order, as the row of the queen in each column
+        return _completions(self.n, ())
+
+    def write_solutions(self, path: str, binary: bool = False, buffer_size: int = 1 << 20) -> int:
+        # Streams every solution to path, one n-byte record each in binary mode or one
+        # line of space-separated rows otherwise; returns the number written.
+        if binary and self.n > 256:
+            raise ValueError("Binary records hold rows below 256.")
+        count = 0
+        buffer = bytearray()
+        with open(path, "wb") as f:
+            for queens in self.iter_solutions():
+                buffer += bytes(queens) if binary else b"%s\n" % " ".join(map(str, queens)).encode()
+                count += 1
+                if len(buffer) >= buffer_size:
+                    f.write(buffer)
+                    buffer.clear()
+            f.write(buffer)
+        return count
+
+    def enumerate_solutions(self, workers: int | None = None, collect: bool = False) -> Enumeration:
+        n = self.n
+        if n <= 1:
+            return Enumeration(1, 1, [tuple(range(n))] if collect else None)
+        # Only solutions whose first queen is in the upper half of the board (or in the
+        # middle row, with the second queen above it) are searched: every solution is
+        # the mirror image of exactly one of those, and so is every canonical solution.
+        middle = n // 2
+        prefixes = [
+            (first, second)
+            for first in range(middle + (n & 1))
+            for second in range(middle if first == middle else n)
+            if abs(first - second) > 1
+        ]
+        tasks = [(n, prefix, collect) for prefix in prefixes]
+        if workers == 1:
+            results = map(_enumerate_prefix, tasks)
+            return _merge_enumeration(results, collect)
+        # one prefix per task so idle workers keep pulling the next subtree
+        with multiprocessing.Pool(workers) as pool:
+            return _merge_enumeration(pool.imap_unordered(_enumerate_prefix, tasks, 1), collect)
+
     def __str__(self) -> str:
         if self.solution is None:
             return "No solution exists"
@@ -47,10 +233,100 @@ class NQueens:
             " ".join("Q" if cell == 1 else "-" for cell in row)
             for row in self.solution
         )
-            
+
+
+def _completions(n: int, prefix: Sequence[int]) -> Iterator[Tuple[int, ...]]:
+    # Yields every solution, as the row of the queen in each column, that starts
+    # with the rows in prefix, in lexicographic order.
+    full = (1 << n) - 1
+    rows = left = right = 0
+    for row in prefix:
+        bit = 1 << row
+        if (rows | left | right) & bit:
+            return
+        rows, left, right = rows | bit, (left | bit) << 1 & full, (right | bit) >> 1
+    start = len(prefix)
+    if start == n:
+        yield tuple(prefix)
+        return
+
+    queens = list(prefix) + [0] * (n - start)
+    stack = [(rows, left, right, full & ~(rows | left | right))]
+    while stack:
+        rows, left, right, free = stack[-1]
+        if not free:
+            stack.pop()
+            continue
+        bit = free & -free
+        stack[-1] = (rows, left, right, free ^ bit)
+        col = start + len(stack) - 1
+        queens[col] = bit.bit_length() - 1
+        if col == n - 1:
+            yield tuple(queens)
+            continue
+        rows, left, right = rows | bit, (left | bit) << 1 & full, (right | bit) >> 1
+        stack.append((rows, left, right, full & ~(rows | left | right)))
+
+
+def _is_canonical(queens: Tuple[int, ...]) -> bool:
+    # A solution is canonical when it is the lexicographically smallest of its
+    # eight rotations and reflections: the inverse permutation is the transpose, and
+    # flipping rows and/or reversing columns of both gives the rest.
+    n = len(queens)
+    inverse = [0] * n
+    for col, row in enumerate(queens):
+        inverse[row] = col
+    for image in (queens, inverse):
+        flipped = tuple(n - 1 - row for row in image)
+        for candidate in (tuple(image), flipped, tuple(reversed(image)), flipped[::-1]):
+            if candidate < queens:
+                return False
+    return True
+
+
+def _enumerate_prefix(task: Tuple[int, Tuple[int, ...], bool]) -> Tuple[int, int, List[Tuple[int, ...]]]:
+    n, prefix, collect = task
+    total = unique = 0
+    canonical = []
+    for queens in _completions(n, prefix):
+        total += 1
+        if _is_canonical(queens):
+            unique += 1
+            if collect:
+                canonical.append(queens)
+    return total, unique, canonical
+
+
+def _merge_enumeration(results, collect: bool) -> Enumeration:
+    total = fundamental = 0
+    solutions = []
+    for count, unique, canonical in results:
+        total += count
+        fundamental += unique
+        solutions.extend(canonical)
+    return Enumeration(2 * total, fundamental, sorted(solutions) if collect else None)
+
+
+def benchmark(sizes: range = range(8, 17)) -> None:
+    for n in sizes:
+        start = time.perf_counter()
+        solutions = NQueens(n).count_solutions()
+        elapsed = time.perf_counter() - start
+        print(f"n={n:2d}: {solutions:10d} solutions in {elapsed:8.3f}s ({solutions / elapsed:,.0f} solutions/s)")
+
 
 if __name__ == "__main__":
-    n = int(input("Enter the number of queens: "))
-    n_queens = NQueens(n)
-    print(n_queens)
-    
\ No newline at end of file
+    if sys.argv[1:2] == ["--enumerate"]:
+        start = time.perf_counter()
+        result = NQueens(int(sys.argv[2])).enumerate_solutions(int(sys.argv[3]) if len(sys.argv) > 3 else None)
+        print(f"{result.total} solutions, {result.fundamental} fundamental in {time.perf_counter() - start:.3f}s")
+    elif sys.argv[1:2] == ["--min-conflicts"]:
+        start = time.perf_counter()
+        n_queens = NQueens(int(sys.argv[2]), "min_conflicts", int(sys.argv[3]) if len(sys.argv) > 3 else None)
+        print(f"placed {n_queens.n} queens in {time.perf_counter() - start:.3f}s")
+    elif sys.argv[1:2] == ["--benchmark"]:
+        benchmark(range(8, int(sys.argv[2]) + 1) if len(sys.argv) > 2 else range(8, 17))
+    else:
+        n = int(input("Enter the number of queens: "))
+        n_queens = NQueens(n)
+        print(n_queens)